@@ -1,12 +1,12 @@
 import streamlit as st
-import pandas as pd
-from app.db import ensure_schema_exists, fetch_all_tables, update_eligible_cases
-from app.session import initialize_session, reset_session_state
+from app.db import count_rows, ensure_schema_exists, fetch_all_tables, update_eligible_cases
+from app.session import initialize_session, record_result_run, reset_session_state, store_result
 from app.file_uploads import handle_file_uploads
 from app.processing import process_case_data
-from app.ui import render_summary, render_case_list, render_synthetic_data_notice
+from app.ui import render_results, render_synthetic_data_notice
 from utils.constants import REQUIRED_COLUMNS
-from utils.helpers import EXAMPLE_DATA, show_csv_schema
+from utils.data_loader import load_example_data
+from utils.helpers import show_csv_schema
 
 # Initialize session state
 initialize_session()
@@ -16,7 +16,7 @@ st.set_page_config(
 st.title("Maryland automated eligibility identification (Proof of Concept)")
 
 # Handle user selection for data source
-if st.session_state.case_data is None:
+if st.session_state.result_handle is None:
     data_source = st.radio(
         "Select data source:", ["Use example data",
                                 "Upload your own data", "Load from MySQL"],
@@ -48,9 +48,13 @@ if st.session_state["data_source"] == "Use example data" and not st.session_stat
 
 # Load example data if selected
 if st.session_state["data_source"] == "Use example data":
-    st.session_state.uploaded_files = EXAMPLE_DATA
+    example_data = load_example_data()
+    st.session_state.uploaded_files = {
+        file: example_data.get(file) for file in REQUIRED_COLUMNS}
     st.session_state.use_example_data = True
-    all_files_uploaded = True
+    all_files_uploaded = bool(example_data)
+    if not example_data:
+        st.error("❌ The example data could not be loaded.")
 elif st.session_state["data_source"] == "Load from MySQL":
     conn_string = st.session_state.get("mysql_conn_string")
 
@@ -73,22 +77,14 @@ elif st.session_state["data_source"] == "Load from MySQL":
         if st.session_state.get("pending_mysql_load"):
             with st.spinner("🔄 Connecting to MySQL and loading tables..."):
                 ensure_schema_exists(conn_string)
-                parties_df, cases_df, charges_df = fetch_all_tables(
-                    conn_string)
-
-                st.session_state.df = charges_df.merge(
-                    cases_df, on="CaseID", how="left"
-                ).merge(parties_df, on="PartyID", how="left")
-
-                st.session_state["raw_parties"] = parties_df
-                st.session_state["raw_cases"] = cases_df
-                st.session_state["raw_charges"] = charges_df
+                # Only row counts are kept here; tables are fetched when processing
+                st.session_state["mysql_row_counts"] = count_rows(conn_string)
 
                 st.success("✅ Connected and all tables loaded!")
             st.session_state["pending_mysql_load"] = False
 
-    df = st.session_state.get("df")
-    all_files_uploaded = isinstance(df, pd.DataFrame) and not df.empty
+    row_counts = st.session_state.get("mysql_row_counts")
+    all_files_uploaded = bool(row_counts) and row_counts["charges"] > 0
 else:
     all_files_uploaded = all(
         st.session_state.uploaded_files[file] is not None for file in REQUIRED_COLUMNS
@@ -101,12 +97,13 @@ if all_files_uploaded and not st.session_state.get("file_processed", False):
         data_source = st.session_state["data_source"]
 
         if data_source == "Upload your own data":
-            st.session_state.case_data, st.session_state.df = process_case_data(
-
+            case_data, df = process_case_data(
                 st.session_state.uploaded_files["parties"],
                 st.session_state.uploaded_files["cases"],
                 st.session_state.uploaded_files["charges"]
             )
+            store_result(case_data, df)
+            record_result_run(case_data, data_source)
 
         elif data_source == "Load from MySQL":
             conn_string = st.session_state.get("mysql_conn_string")
@@ -115,13 +112,14 @@ if all_files_uploaded and not st.session_state.get("file_processed", False):
                     with st.spinner("⏳ Processing data and determining eligibility..."):
                         parties_df, cases_df, charges_df = fetch_all_tables(
                             conn_string)
-                        st.session_state.case_data, st.session_state.df = process_case_data(
+                        case_data, df = process_case_data(
                             parties_df, cases_df, charges_df
                         )
+                        store_result(case_data, df)
+                        record_result_run(case_data, data_source)
 
                         # Update eligible column for qualifying cases
-                        update_eligible_cases(
-                            conn_string, st.session_state.case_data)
+                        update_eligible_cases(conn_string, case_data)
                         st.success("✅ Eligibility determination complete.")
                 except Exception as e:
                     st.error(f"❌ Failed to fetch/process MySQL data: {e}")
@@ -129,11 +127,14 @@ if all_files_uploaded and not st.session_state.get("file_processed", False):
                 st.error("❌ MySQL connection string is missing.")
 
         elif data_source == "Use example data":
-            st.session_state.case_data, st.session_state.df = process_case_data(
-                EXAMPLE_DATA["parties"],
-                EXAMPLE_DATA["cases"],
-                EXAMPLE_DATA["charges"]
+            example_data = st.session_state.uploaded_files
+            case_data, df = process_case_data(
+                example_data["parties"],
+                example_data["cases"],
+                example_data["charges"]
             )
+            store_result(case_data, df)
+            record_result_run(case_data, data_source)
 
         st.session_state.uploaded_files = {
             file: None for file in REQUIRED_COLUMNS
@@ -143,11 +144,8 @@ if all_files_uploaded and not st.session_state.get("file_processed", False):
         st.rerun()
 
 # Show case summary and case details
-if st.session_state.get("file_processed", False) and st.session_state.case_data is not None:
+if st.session_state.get("file_processed", False):
     if st.button("🔄 Upload a New File", key="upload_new_file"):
         reset_session_state()
 
-    if st.session_state.selected_case is None:
-        render_summary()
-
-    render_case_list()
+    render_results()
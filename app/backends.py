@@ -0,0 +1,401 @@
+"""
+Execution backends for the eligibility pipeline.
+
+A backend reads and coerces the three input tables and joins them into the
+charge-level frame that rule evaluation runs on. "pandas" (the default) runs
+everything eagerly in pandas. "duckdb" and "polars" run the same steps on a
+multi-threaded embedded engine: file inputs are scanned with only the
+spec'd columns (projection pushdown), rows without a join key are dropped in
+the scan (predicate pushdown), and type coercion, joins and charge flags run
+inside the engine. Entity resolution and rule evaluation are shared, so every
+backend produces the same results.
+
+Pick a backend with the PIPELINE_BACKEND environment variable or the
+backend argument of process_case_data. A backend holds its engine's state
+(the DuckDB connection) until close() is called. Sources may be DataFrames or paths to
+CSV or Parquet files.
+"""
+import os
+import re
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from utils.constants import (
+    COLUMN_SPECS, EXCLUDED_MISDEMEANORS, NON_CONVICTION_TERMS, REQUIRED_COLUMNS)
+from utils.eligibility import categorize_charges
+from utils.schema import MAX_BAD_EXAMPLES, apply_schema
+
+PIPELINE_BACKEND = os.environ.get("PIPELINE_BACKEND", "pandas")
+
+# Rows without these keys cannot join to anything, so file scans skip them
+JOIN_KEYS = {"parties": "PartyID", "cases": "CaseID", "charges": "CaseID"}
+# pandas.read_csv's default missing-value markers, applied by every backend
+CSV_NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+    "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+ROW = "__row"
+# Dtypes categorize_charges gives its flags (str.contains on strings is nullable)
+FLAG_DTYPES = {
+    "Is Misdemeanor": "boolean",
+    "Is Felony": "boolean",
+    "Is Non-Conviction": "boolean",
+    "Is Excluded Misdemeanor": "bool",
+    "Is Domestic Violence": "boolean",
+}
+
+
+def source_format(source):
+    """Returns "frame", "csv" or "parquet" for a pipeline input."""
+    if isinstance(source, pd.DataFrame):
+        return "frame"
+    suffix = Path(source).suffix.lower()
+    if suffix not in (".csv", ".parquet"):
+        raise ValueError(f"Unsupported input file type: {source}")
+    return suffix[1:]
+
+
+def restore_dtypes(df):
+    """Gives spec'd columns the dtypes apply_schema produces, so backends return identical frames."""
+    for spec in COLUMN_SPECS.values():
+        for col, rules in spec.items():
+            if col not in df.columns:
+                continue
+            if rules["dtype"] == "int":
+                df[col] = df[col].astype("Int64")
+            elif rules["dtype"] == "date":
+                df[col] = df[col].astype("datetime64[us]")
+            else:
+                df[col] = df[col].astype("string")
+    for col, dtype in FLAG_DTYPES.items():
+        if col in df.columns:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def _match_dtypes(df, like):
+    """Casts df's columns that also appear in like to like's dtypes."""
+    for col in like.columns:
+        if col in df.columns and df[col].dtype != like[col].dtype:
+            df[col] = df[col].astype(like[col].dtype)
+    return df
+
+
+def _arrow_to_pandas(table):
+    """Converts an Arrow table to pandas without copying strings into Python objects."""
+    pa = _require("pyarrow")
+    strings = {pa.string(): pd.StringDtype(), pa.large_string(): pd.StringDtype(),
+               pa.string_view(): pd.StringDtype()}
+    return restore_dtypes(table.to_pandas(types_mapper=strings.get))
+
+
+def _require(module):
+    try:
+        return __import__(module)
+    except ImportError as e:
+        raise ImportError(
+            f"This pipeline backend needs the {module} package: pip install {module}"
+        ) from e
+
+
+class PandasBackend:
+    """The original eager pandas pipeline."""
+
+    def prepare(self, source, table):
+        """Reads and coerces one table; returns (table, missing_columns, bad_values)."""
+        kind = source_format(source)
+        if kind != "frame":
+            spec = COLUMN_SPECS[table]
+            if kind == "csv":
+                source = pd.read_csv(
+                    source, dtype=str, usecols=lambda col: col.strip() in spec)
+            else:
+                source = pd.read_parquet(source)
+                source = source[[col for col in source.columns if col.strip() in spec]]
+            key = JOIN_KEYS[table]
+            if key in source.columns:
+                source = source[source[key].notna()].reset_index(drop=True)
+        missing, bad_values = apply_schema(source, table)
+        return source, missing, bad_values
+
+    def to_pandas(self, prepared):
+        return prepared
+
+    def join(self, parties_df, cases, charges):
+        """Merges charges with their case and party and adds the charge flags."""
+        merged_df = charges.merge(
+            cases, on="CaseID", how="left"
+        ).merge(parties_df, on="PartyID", how="left")
+        return categorize_charges(merged_df)
+
+    def close(self):
+        pass
+
+
+# strptime directives in the spec's date formats, as the digits pandas accepts for them
+FORMAT_DIGITS = {"%m": r"\d{1,2}", "%d": r"\d{1,2}", "%Y": r"\d{4}"}
+
+
+def format_pattern(date_format):
+    """
+    Anchored regex for text in date_format. DuckDB and Polars parse %Y from
+    fewer than four digits ("08/30/24" as year 24); pandas does not, so
+    values are matched against this before parsing.
+    """
+    parts = re.split(r"(%[a-zA-Z])", date_format)
+    return "^" + "".join(FORMAT_DIGITS[part] if part.startswith("%") else re.escape(part)
+                         for part in parts) + "$"
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_list(values):
+    return ", ".join("'" + str(v).replace("'", "''") + "'" for v in values)
+
+
+class DuckDBBackend:
+    """Runs coercion, joins and charge flags as DuckDB SQL on an in-memory database."""
+
+    def __init__(self):
+        duckdb = _require("duckdb")
+        self.con = duckdb.connect()
+
+    def _raw_table(self, source, table):
+        """Exposes a source as the view raw_<table>_rows (columns as given, plus a row number)."""
+        kind = source_format(source)
+        raw = f"raw_{table}"
+        if kind == "frame":
+            source.columns = source.columns.str.strip()
+            self.con.register(f"input_{table}", source.assign(**{ROW: np.arange(len(source))}))
+            self.con.execute(f"CREATE OR REPLACE VIEW {raw}_rows AS SELECT * FROM input_{table}")
+            return f"{raw}_rows"
+
+        path = "'" + str(source).replace("'", "''") + "'"
+        if kind == "csv":
+            scan = (f"read_csv({path}, header=true, all_varchar=true, "
+                    f"nullstr=[{_sql_list(CSV_NULL_VALUES)}])")
+        else:
+            scan = f"read_parquet({path})"
+        spec = COLUMN_SPECS[table]
+        columns = [row[0] for row in self.con.execute(f"DESCRIBE SELECT * FROM {scan}").fetchall()]
+        projection = ", ".join(
+            f"{_quote(col)} AS {_quote(col.strip())}" for col in columns if col.strip() in spec)
+        key = JOIN_KEYS[table]
+        where = f"WHERE {_quote(key)} IS NOT NULL" if key in projection else ""
+        self.con.execute(
+            f"CREATE OR REPLACE TEMP TABLE {raw} AS SELECT {projection} FROM {scan} {where}")
+        self.con.execute(f"CREATE OR REPLACE VIEW {raw}_rows AS SELECT *, rowid AS {ROW} FROM {raw}")
+        return f"{raw}_rows"
+
+    def _coerce_sql(self, col, rules, col_type):
+        column = _quote(col)
+        if rules["dtype"] == "int":
+            number = f"TRY_CAST(trim(CAST({column} AS VARCHAR)) AS DOUBLE)"
+            return f"CASE WHEN {number} = floor({number}) THEN CAST({number} AS BIGINT) END"
+        if rules["dtype"] == "date":
+            if col_type.startswith(("DATE", "TIMESTAMP")):
+                return f"CAST({column} AS TIMESTAMP)"
+            text = f"trim(CAST({column} AS VARCHAR), ' \t\n\r')"
+            date_format = rules.get("format")
+            if date_format and date_format != "ISO8601":
+                return (f"CASE WHEN regexp_full_match({text}, '{format_pattern(date_format)}') "
+                        f"THEN TRY_STRPTIME({text}, '{date_format}') END")
+            return f"TRY_CAST({text} AS TIMESTAMP)"
+        text = f"CAST({column} AS VARCHAR)"
+        if "strip" in rules.get("normalize", ()):
+            text = f"trim({text}, ' \t\n\r')"
+        if "upper" in rules.get("normalize", ()):
+            text = f"upper({text})"
+        return text
+
+    def prepare(self, source, table):
+        raw = self._raw_table(source, table)
+        spec = COLUMN_SPECS[table]
+        types = dict(self.con.execute(f"SELECT column_name, column_type FROM (DESCRIBE {raw})").fetchall())
+
+        missing = [col for col in REQUIRED_COLUMNS[table] if col not in types]
+        if missing:
+            return None, missing, {}
+
+        spec = {col: rules for col, rules in spec.items() if col in types}
+        coerced = {col: self._coerce_sql(col, rules, types[col]) for col, rules in spec.items()}
+        select = ", ".join(
+            f"{coerced[col]} AS {_quote(col)}" if col in coerced else _quote(col)
+            for col in types)
+        self.con.execute(f"CREATE OR REPLACE TEMP TABLE {table} AS SELECT {select} FROM {raw}")
+
+        # Values present in the input but lost in coercion could not be read
+        pairs = f"{raw} r JOIN {table} c ON r.{ROW} = c.{ROW}"
+        bad = {col: f"r.{_quote(col)} IS NOT NULL AND c.{_quote(col)} IS NULL" for col in spec}
+        counts = self.con.execute("SELECT " + ", ".join(
+            f"count(*) FILTER (WHERE {condition})" for condition in bad.values()
+        ) + f" FROM {pairs}").fetchone()
+        bad_values = {}
+        for (col, condition), count in zip(bad.items(), counts):
+            if count:
+                examples = self.con.execute(
+                    f"SELECT DISTINCT CAST(r.{_quote(col)} AS VARCHAR) FROM {pairs} "
+                    f"WHERE {condition} LIMIT {MAX_BAD_EXAMPLES}").fetchall()
+                bad_values[col] = {"count": count, "examples": [e[0] for e in examples]}
+
+        # Only the coerced table is needed from here on
+        self.con.execute(f"DROP VIEW {raw}")
+        self.con.execute(f"DROP TABLE IF EXISTS raw_{table}")
+        return table, missing, bad_values
+
+    def _fetch(self, sql):
+        """Runs a query and returns it as pandas through Arrow, keeping strings Arrow-backed."""
+        result = self.con.execute(sql).arrow()
+        return _arrow_to_pandas(result.read_all() if hasattr(result, "read_all") else result)
+
+    def to_pandas(self, prepared):
+        return self._fetch(f"SELECT * EXCLUDE ({ROW}) FROM {prepared} ORDER BY {ROW}")
+
+    def join(self, parties_df, cases, charges):
+        self.con.register(
+            "resolved_parties", parties_df.assign(**{ROW: np.arange(len(parties_df))}))
+        flags = {
+            "Is Misdemeanor": "contains(upper(ch.\"Charge Class\"), 'MISDEMEANOR')",
+            "Is Felony": "contains(upper(ch.\"Charge Class\"), 'FELONY')",
+            "Is Non-Conviction": "regexp_matches(upper(ch.\"Disposition\"), "
+                                 f"'{'|'.join(NON_CONVICTION_TERMS)}')",
+            "Is Excluded Misdemeanor": f"ch.\"Statute Code\" IN ({_sql_list(EXCLUDED_MISDEMEANORS)})",
+            "Is Domestic Violence": "contains(upper(ca.\"Case Type\"), 'DOMESTIC VIOLENCE')",
+        }
+        flag_sql = ", ".join(f"coalesce({expr}, false) AS {_quote(name)}"
+                             for name, expr in flags.items())
+        df = self._fetch(f"""
+            SELECT ch.* EXCLUDE ({ROW}), ca.* EXCLUDE ({ROW}, "CaseID"),
+                   p.* EXCLUDE ({ROW}, "PartyID"), {flag_sql}
+            FROM {charges} ch
+            LEFT JOIN {cases} ca ON ch."CaseID" = ca."CaseID"
+            LEFT JOIN resolved_parties p ON ca."PartyID" = p."PartyID"
+            ORDER BY ch.{ROW}, ca.{ROW}, p.{ROW}
+        """)
+        return _match_dtypes(df, parties_df)
+
+    def close(self):
+        """Closes the backend's DuckDB connection and the tables registered on it."""
+        self.con.close()
+
+
+class PolarsBackend:
+    """Runs coercion, joins and charge flags as Polars lazy queries."""
+
+    def __init__(self):
+        self.pl = _require("polars")
+
+    def _scan(self, source, table):
+        pl = self.pl
+        kind = source_format(source)
+        if kind == "frame":
+            source.columns = source.columns.str.strip()
+            return pl.from_pandas(source).lazy().with_row_index(ROW)
+
+        if kind == "csv":
+            scan = pl.scan_csv(source, infer_schema=False, null_values=CSV_NULL_VALUES)
+        else:
+            scan = pl.scan_parquet(source)
+        spec = COLUMN_SPECS[table]
+        names = scan.collect_schema().names()
+        scan = scan.select(
+            [pl.col(col).alias(col.strip()) for col in names if col.strip() in spec])
+        key = JOIN_KEYS[table]
+        if key in [col.strip() for col in names]:
+            scan = scan.filter(pl.col(key).is_not_null())
+        return scan.with_row_index(ROW)
+
+    def _coerce_expr(self, col, rules, col_type):
+        pl = self.pl
+        column = pl.col(col)
+        text = column.cast(pl.String)
+        if rules["dtype"] == "int":
+            number = text.str.strip_chars().cast(pl.Float64, strict=False)
+            return pl.when(number == number.floor()).then(number.cast(pl.Int64))
+        if rules["dtype"] == "date":
+            if col_type.is_temporal():
+                return column.cast(pl.Datetime("us"))
+            date_format = rules.get("format")
+            text = text.str.strip_chars()
+            if date_format == "ISO8601" or date_format is None:
+                return text.str.to_datetime(time_unit="us", strict=False)
+            return pl.when(text.str.contains(format_pattern(date_format))).then(
+                text.str.to_datetime(date_format, time_unit="us", strict=False))
+        if "strip" in rules.get("normalize", ()):
+            text = text.str.strip_chars()
+        if "upper" in rules.get("normalize", ()):
+            text = text.str.to_uppercase()
+        return text
+
+    def prepare(self, source, table):
+        pl = self.pl
+        raw = self._scan(source, table).collect().lazy()
+        schema = raw.collect_schema()
+        spec = COLUMN_SPECS[table]
+
+        missing = [col for col in REQUIRED_COLUMNS[table] if col not in schema]
+        if missing:
+            return None, missing, {}
+
+        spec = {col: rules for col, rules in spec.items() if col in schema}
+        coerced = {col: self._coerce_expr(col, rules, schema[col]) for col, rules in spec.items()}
+        prepared = raw.with_columns([expr.alias(col) for col, expr in coerced.items()])
+        bad = {col: pl.col(col).is_not_null() & expr.is_null() for col, expr in coerced.items()}
+
+        frame, counts = pl.collect_all([
+            prepared, raw.select([mask.sum().alias(col) for col, mask in bad.items()])])
+        bad_values = {}
+        for col, count in counts.row(0, named=True).items():
+            if count:
+                examples = (raw.filter(bad[col]).select(pl.col(col).cast(pl.String))
+                            .unique(maintain_order=True).head(MAX_BAD_EXAMPLES).collect())
+                bad_values[col] = {"count": count, "examples": examples[col].to_list()}
+        return frame.lazy(), missing, bad_values
+
+    def to_pandas(self, prepared):
+        return _arrow_to_pandas(prepared.sort(ROW).drop(ROW).collect().to_arrow())
+
+    def join(self, parties_df, cases, charges):
+        pl = self.pl
+        parties = pl.from_pandas(parties_df).lazy().with_row_index(ROW)
+        contains = lambda col, text: pl.col(col).str.to_uppercase().str.contains(text, literal=True)
+        merged = (
+            charges.join(cases.rename({ROW: "__case_row"}), on="CaseID", how="left")
+            .join(parties.rename({ROW: "__party_row"}), on="PartyID", how="left")
+            .sort([ROW, "__case_row", "__party_row"], nulls_last=True)
+            .with_columns([
+                contains("Charge Class", "MISDEMEANOR").fill_null(False).alias("Is Misdemeanor"),
+                contains("Charge Class", "FELONY").fill_null(False).alias("Is Felony"),
+                pl.col("Disposition").str.to_uppercase()
+                .str.contains("|".join(NON_CONVICTION_TERMS)).fill_null(False)
+                .alias("Is Non-Conviction"),
+                pl.col("Statute Code").is_in(list(EXCLUDED_MISDEMEANORS)).fill_null(False)
+                .alias("Is Excluded Misdemeanor"),
+                contains("Case Type", "DOMESTIC VIOLENCE").fill_null(False)
+                .alias("Is Domestic Violence"),
+            ])
+            .drop([ROW, "__case_row", "__party_row"])
+        )
+        return _match_dtypes(_arrow_to_pandas(merged.collect().to_arrow()), parties_df)
+
+    def close(self):
+        pass
+
+
+BACKENDS = {
+    "pandas": PandasBackend,
+    "duckdb": DuckDBBackend,
+    "polars": PolarsBackend,
+}
+
+
+def get_backend(name=PIPELINE_BACKEND):
+    """
+    Returns a fresh backend instance (DuckDB connections are not shared
+    between threads). Call its close() when done with it.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown pipeline backend: {name} (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
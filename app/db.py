@@ -1,9 +1,26 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 import pandas as pd
 import mysql.connector  # type: ignore
 from urllib.parse import urlparse
 
-from utils.constants import REQUIRED_COLUMNS
-from utils.helpers import EXAMPLE_DATA
+from utils.constants import COLUMN_SPECS, REQUIRED_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Number of primary key ranges cases and charges are split into when reading,
+# unless MYSQL_READ_SHARDS is set (read on each call)
+DEFAULT_READ_SHARDS = 4
+SHARD_KEYS = {"cases": "CaseID", "charges": "ChargeID"}
+TABLES = ["parties", "cases", "charges"]
+PRIMARY_KEYS = {"parties": "PartyID", "cases": "CaseID", "charges": "ChargeID"}
+# Rows per multi-row INSERT when importing
+IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", 5000))
+# Tables imported with at least this many rows have their secondary indexes
+# dropped for the load and rebuilt afterwards
+BULK_INDEX_THRESHOLD = int(os.environ.get("BULK_INDEX_THRESHOLD", 100_000))
 
 # --- Connection ---
 
@@ -46,86 +63,378 @@ def get_connection(conn_info=None):
 # --- Table creation logic ---
 
 
+# Columns of each table, in order, with their SQL type (and column options).
+# The table's PRIMARY_KEYS column is declared as its primary key.
+TABLE_SCHEMAS = {
+    "cases": [
+        ("CaseID", "INT"),
+        ("PartyID", "INT"),
+        ("Case Title", "VARCHAR(255)"),
+        ("Case Number", "VARCHAR(100)"),
+        ("Court System", "VARCHAR(100)"),
+        ("Location", "VARCHAR(100)"),
+        ("Case Type", "VARCHAR(100)"),
+        ("Filing Date", "DATE"),
+        ("Case Status", "VARCHAR(50)"),
+        ("Judicial Officer", "VARCHAR(100)"),
+        ("eligible", "BOOLEAN DEFAULT FALSE"),
+    ],
+    "charges": [
+        ("ChargeID", "INT"),
+        ("CaseID", "INT"),
+        ("Charge No", "INT"),
+        ("CJIS Code", "VARCHAR(50)"),
+        ("Statute Code", "VARCHAR(50)"),
+        ("Charge Description", "VARCHAR(255)"),
+        ("Charge Class", "VARCHAR(100)"),
+        ("Offense Date", "DATE"),
+        ("Agency Name", "VARCHAR(255)"),
+        ("Plea", "VARCHAR(100)"),
+        ("Plea Date", "DATE"),
+        ("Disposition", "VARCHAR(100)"),
+        ("Disposition Date", "DATE"),
+        ("Jail Term (Years)", "INT"),
+        ("Probation (Years)", "INT"),
+    ],
+    "parties": [
+        ("PartyID", "INT"),
+        ("Name", "VARCHAR(255)"),
+        ("Race", "VARCHAR(50)"),
+        ("Sex", "VARCHAR(10)"),
+        ("DOB", "DATE"),
+        ("Address", "VARCHAR(255)"),
+        ("City", "VARCHAR(100)"),
+        ("State", "VARCHAR(10)"),
+        ("Zip Code", "VARCHAR(20)"),
+        ("Aliases", "VARCHAR(255)"),
+    ],
+}
+
+
+def table_ddl(table):
+    """CREATE TABLE IF NOT EXISTS statement for a table in TABLE_SCHEMAS."""
+    columns = ",\n".join(
+        f"    `{col}` {sql_type}" + (" PRIMARY KEY" if col == PRIMARY_KEYS[table] else "")
+        for col, sql_type in TABLE_SCHEMAS[table])
+    return f"CREATE TABLE IF NOT EXISTS {table} (\n{columns}\n)"
+
+
+TABLE_DEFINITIONS = {table: table_ddl(table) for table in TABLE_SCHEMAS}
+TABLE_COLUMNS = {table: [col for col, _ in schema] for table, schema in TABLE_SCHEMAS.items()}
+
+
+# Secondary indexes for the access paths the app uses, by table:
+# - cases.`Case Number`: write-back UPDATEs in mark_case_eligible
+# - cases.PartyID, charges.CaseID: the charges -> cases -> parties joins
+# - charges (`Charge Class`, `Disposition Date`, CaseID): class/date pushdown,
+#   seeking on the class (equality) then the date (range), and covering the
+#   CaseID needed for the join
+SECONDARY_INDEXES = {
+    "cases": {
+        "idx_cases_case_number": ["Case Number"],
+        "idx_cases_party": ["PartyID"],
+    },
+    "charges": {
+        "idx_charges_case": ["CaseID"],
+        "idx_charges_class_disposition": ["Charge Class", "Disposition Date", "CaseID"],
+    },
+}
+
+
+def index_ddl(table, name, columns):
+    """CREATE INDEX statement for one secondary index."""
+    column_list = ", ".join(f"`{col}`" for col in columns)
+    return f"CREATE INDEX {name} ON {table} ({column_list})"
+
+
+def _existing_indexes(cursor):
+    cursor.execute(
+        "SELECT TABLE_NAME, INDEX_NAME FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE()"
+    )
+    return {(table.lower(), name) for table, name in cursor.fetchall()}
+
+
+def find_missing_indexes(cursor):
+    """Returns (table, index name, columns) for secondary indexes absent from the database."""
+    existing = _existing_indexes(cursor)
+    return [
+        (table, name, columns)
+        for table, indexes in SECONDARY_INDEXES.items()
+        for name, columns in indexes.items()
+        if (table, name) not in existing
+    ]
+
+
+def _create_tables(cursor):
+    for ddl in TABLE_DEFINITIONS.values():
+        cursor.execute(ddl)
+
+
+def _create_missing_indexes(cursor):
+    missing = find_missing_indexes(cursor)
+    for table, name, columns in missing:
+        cursor.execute(index_ddl(table, name, columns))
+    return missing
+
+
+# Versioned schema migrations, applied in order and recorded in
+# schema_migrations. Each step must be safe to re-run.
+SCHEMA_MIGRATIONS = [
+    (1, "Create cases, charges and parties tables", _create_tables),
+    (2, "Add secondary indexes for joins, write-back and pushdown", _create_missing_indexes),
+]
+
+
 def ensure_schema_exists(conn_info):
-    """Creates the necessary tables if they don't exist based on REQUIRED_COLUMNS."""
+    """
+    Brings the database schema up to date: applies any pending migrations, then
+    adds secondary indexes missing from existing tables (e.g. created before
+    migrations existed or dropped by hand). Returns the indexes it created.
+    """
     conn = get_connection(conn_info)
     cursor = conn.cursor()
 
-    table_definitions = {
-        "cases": f"""
-            CREATE TABLE IF NOT EXISTS cases (
-                CaseID INT PRIMARY KEY,
-                PartyID INT,
-                `Case Title` VARCHAR(255),
-                `Case Number` VARCHAR(100),
-                `Court System` VARCHAR(100),
-                Location VARCHAR(100),
-                `Case Type` VARCHAR(100),
-                `Filing Date` DATE,
-                `Case Status` VARCHAR(50),
-                `Judicial Officer` VARCHAR(100),
-                eligible BOOLEAN DEFAULT FALSE
-            )
-        """,
-        "charges": f"""
-            CREATE TABLE IF NOT EXISTS charges (
-                ChargeID INT PRIMARY KEY,
-                CaseID INT,
-                `Charge No` INT,
-                `CJIS Code` VARCHAR(50),
-                `Statute Code` VARCHAR(50),
-                `Charge Description` VARCHAR(255),
-                `Charge Class` VARCHAR(100),
-                `Offense Date` DATE,
-                `Agency Name` VARCHAR(255),
-                Plea VARCHAR(100),
-                `Plea Date` DATE,
-                Disposition VARCHAR(100),
-                `Disposition Date` DATE,
-                `Jail Term (Years)` INT,
-                `Probation (Years)` INT
-            )
-        """,
-        "parties": f"""
-            CREATE TABLE IF NOT EXISTS parties (
-                PartyID INT PRIMARY KEY,
-                Name VARCHAR(255),
-                Race VARCHAR(50),
-                Sex VARCHAR(10),
-                DOB DATE,
-                Address VARCHAR(255),
-                City VARCHAR(100),
-                State VARCHAR(10),
-                `Zip Code` VARCHAR(20),
-                Aliases VARCHAR(255)
-            )
-        """
-    }
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255),
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT version FROM schema_migrations")
+    applied = {row[0] for row in cursor.fetchall()}
 
-    for table, ddl in table_definitions.items():
-        cursor.execute(ddl)
+    created = []
+    for version, description, migrate in SCHEMA_MIGRATIONS:
+        if version in applied:
+            continue
+        created += migrate(cursor) or []
+        cursor.execute(
+            "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+            (version, description)
+        )
+        conn.commit()
+
+    created += _create_missing_indexes(cursor)
 
     conn.commit()
     cursor.close()
     conn.close()
+    return created
+
+
+# --- Bulk import ---
+
+
+def _import_rows(df, columns):
+    """Python row tuples for the given columns, with None for missing values and dates as date objects."""
+    values = []
+    for col in columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            series = series.dt.date
+        values.append(series.astype(object).where(series.notna(), None).tolist())
+    return list(zip(*values))
+
+
+def upsert_sql(table, columns, n_rows):
+    """Multi-row INSERT of n_rows rows that updates the imported columns of rows already present."""
+    column_list = ", ".join(f"`{col}`" for col in columns)
+    row = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    updates = ", ".join(f"`{col}` = new.`{col}`" for col in columns)
+    return (f"INSERT INTO {table} ({column_list}) VALUES {', '.join([row] * n_rows)} "
+            f"AS new ON DUPLICATE KEY UPDATE {updates}")
+
 
+def _drop_secondary_indexes(cursor, table):
+    existing = _existing_indexes(cursor)
+    dropped = [name for name in SECONDARY_INDEXES.get(table, {}) if (table, name) in existing]
+    for name in dropped:
+        cursor.execute(f"DROP INDEX {name} ON {table}")
+    return dropped
 
-def fetch_all_tables(conn_info):
+
+def import_table(conn, table, df, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    """
+    Upserts a validated table (coerced by apply_schema) in batched multi-row
+    INSERTs, committed as one transaction. Every column of the table's DDL
+    that df has is written; rows without a primary key are skipped. Large
+    loads drop the table's secondary indexes first and rebuild them
+    afterwards, once, instead of updating them on every row.
+    Calls progress(table, rows_done, rows_total) after each batch and
+    returns the number of rows written.
+    """
+    columns = [col for col in TABLE_COLUMNS[table] if col in df.columns]
+    rows = _import_rows(df[df[PRIMARY_KEYS[table]].notna()], columns)
+    cursor = conn.cursor()
+
+    # Index DDL commits implicitly, so it stays outside the load's transaction
+    rebuild = len(rows) >= BULK_INDEX_THRESHOLD and _drop_secondary_indexes(cursor, table)
+    try:
+        try:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                cursor.execute(upsert_sql(table, columns, len(batch)),
+                               tuple(chain.from_iterable(batch)))
+                if progress:
+                    progress(table, start + len(batch), len(rows))
+            conn.commit()
+        except Exception as load_error:
+            conn.rollback()
+            if rebuild:
+                try:
+                    _create_missing_indexes(cursor)
+                except Exception as index_error:
+                    # The load's error is the one to report; the rebuild failure is its cause
+                    raise load_error from index_error
+            raise
+        if rebuild:
+            _create_missing_indexes(cursor)
+    finally:
+        cursor.close()
+    return len(rows)
+
+
+def bulk_import(conn_info, tables, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    """
+    Loads validated parties, cases and charges ({table: DataFrame}) into the
+    database, creating or migrating the schema first. Each table is one
+    transaction, so a failed table leaves earlier tables imported and itself
+    unchanged. Existing rows are updated by primary key; the cases.eligible
+    flag is kept unless the input has that column. Returns {table: rows written}.
+    """
+    ensure_schema_exists(conn_info)
     conn = get_connection(conn_info)
-    cursor = conn.cursor(dictionary=True)
+    try:
+        return {table: import_table(conn, table, tables[table], batch_size, progress)
+                for table in TABLES}
+    finally:
+        conn.close()
+
+
+# Pandas dtype for each COLUMN_SPECS dtype, given to fetched rows
+FETCH_DTYPES = {"int": "Int64", "str": "string", "date": "datetime64[us]"}
+
+
+def _typed_frame(table, columns, rows):
+    """Builds a DataFrame from fetched rows, with COLUMN_SPECS dtypes for the table's spec'd columns."""
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    for col, rules in COLUMN_SPECS[table].items():
+        if col in df.columns:
+            df[col] = df[col].astype(FETCH_DTYPES[rules["dtype"]])
+    return df
+
+
+def _fetch_table(cursor, table):
+    cursor.execute(f"SELECT * FROM {table}")
+    return _typed_frame(table, cursor.column_names, cursor.fetchall())
+
+
+def fetch_all_tables_sequential(conn_info):
+    """Reads the three tables one after another on a single connection; the fallback path."""
+    conn = get_connection(conn_info)
+    try:
+        cursor = conn.cursor()
+        tables = tuple(_fetch_table(cursor, table) for table in TABLES)
+        cursor.close()
+    finally:
+        conn.close()
+    return tables
+
 
-    def fetch(table):
-        cursor.execute(f"SELECT * FROM {table}")
-        return pd.DataFrame(cursor.fetchall())
+def _shard_ranges(cursor, table, key, shards):
+    """Splits a table's primary key range into up to `shards` inclusive (low, high) ranges."""
+    cursor.execute(f"SELECT MIN({key}), MAX({key}) FROM {table}")
+    low, high = cursor.fetchone()
+    if low is None:
+        return []
+    step = max(1, -(-(high - low + 1) // shards))
+    return [(start, min(start + step - 1, high)) for start in range(low, high + 1, step)]
 
-    parties = fetch("parties")
-    cases = fetch("cases")
-    charges = fetch("charges")
+
+def _read_shards(conn_info, tasks):
+    """Runs (table, sql, params) reads on one connection of its own; returns [(table, DataFrame)]."""
+    conn = get_connection(conn_info)
+    try:
+        cursor = conn.cursor()
+        frames = []
+        for table, sql, params in tasks:
+            cursor.execute(sql, params)
+            frames.append((table, _typed_frame(table, cursor.column_names, cursor.fetchall())))
+        cursor.close()
+    finally:
+        conn.close()
+    return frames
+
+
+def fetch_all_tables(conn_info, shards=None):
+    """
+    Reads parties, cases and charges concurrently. cases and charges are split
+    into primary key ranges (SHARD_KEYS), and the reads are spread over
+    shards + 1 worker threads, each with its own connection, so load time is
+    bounded by the largest shard rather than the sum of three table scans.
+    Each shard is built into a typed DataFrame by its worker and the shards
+    of a table are concatenated. shards defaults to MYSQL_READ_SHARDS. Falls
+    back to a single connection if shards <= 1 or a parallel read fails.
+    """
+    if shards is None:
+        shards = int(os.environ.get("MYSQL_READ_SHARDS", DEFAULT_READ_SHARDS))
+    if shards <= 1:
+        return fetch_all_tables_sequential(conn_info)
+
+    if isinstance(conn_info, str):
+        conn_info = parse_connection_string(conn_info)
+
+    try:
+        # Plan the work: one query for parties, a range query per shard otherwise
+        tasks = {table: [(f"SELECT * FROM {table}", ())]
+                 for table in TABLES}
+        conn = get_connection(conn_info)
+        try:
+            cursor = conn.cursor()
+            for table, key in SHARD_KEYS.items():
+                ranges = _shard_ranges(cursor, table, key, shards)
+                if ranges:
+                    tasks[table] = [
+                        (f"SELECT * FROM {table} WHERE {key} BETWEEN %s AND %s ORDER BY {key}", bounds)
+                        for bounds in ranges
+                    ]
+            cursor.close()
+        finally:
+            conn.close()
+
+        # Deal the reads out round-robin; list order keeps shards in key order
+        reads = [(table, sql, params) for table, queries in tasks.items() for sql, params in queries]
+        workers = min(shards + 1, len(reads))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            batches = list(executor.map(
+                lambda worker: _read_shards(conn_info, reads[worker::workers]), range(workers)))
+    except mysql.connector.Error as e:
+        logger.warning("Parallel read failed (%s); falling back to a single connection", e)
+        return fetch_all_tables_sequential(conn_info)
+
+    # Reassemble each table's shards in the order they were planned
+    shards_by_table = {table: [] for table in TABLES}
+    for index in range(len(reads)):
+        table, frame = batches[index % workers][index // workers]
+        shards_by_table[table].append(frame)
+    return tuple(pd.concat(shards_by_table[table], ignore_index=True) for table in TABLES)
+
+
+def count_rows(conn_info):
+    """Returns the number of rows in each table, without fetching them."""
+    conn = get_connection(conn_info)
+    cursor = conn.cursor()
+
+    counts = {}
+    for table in ["parties", "cases", "charges"]:
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        counts[table] = cursor.fetchone()[0]
 
     cursor.close()
     conn.close()
-
-    return parties, cases, charges
+    return counts
 
 
 def mark_case_eligible(conn_info, case_number):
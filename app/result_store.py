@@ -0,0 +1,306 @@
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from app.processing import determine_eligibility
+from app.search_index import SearchIndex
+from utils.constants import DEFAULT_RULE_PACK
+from utils.cube import build_cube, update_cube
+
+RESULT_STORE_DIR = os.environ.get(
+    "RESULT_STORE_DIR", os.path.join(tempfile.gettempdir(), "eligibility-results"))
+# Unreferenced results kept around so re-running the same data is instant
+MAX_UNREFERENCED = 4
+# Results untouched for this long are evicted even if a session still holds
+# them, since Streamlit gives no signal when a browser tab goes away
+SESSION_TTL = 2 * 60 * 60
+ELIGIBLE_PREFIX = "✅ Eligible"
+WAITING_PREFIX = "⏳"
+
+
+def dataset_key(case_data, charges):
+    """Content hash of a result, so identical results from any session share one file."""
+    digest = hashlib.sha1()
+    for df in (case_data, charges):
+        digest.update(",".join(map(str, df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+class ResultStore:
+    """
+    Process-wide store for processed results, shared by every Streamlit session.
+    Each distinct result is written once to an SQLite file; sessions hold only
+    the returned key and read back the page or case they are viewing.
+    Datasets are reference counted and evicted when no longer needed. Waiting
+    cases are re-evaluated in place once their wait ends (see refresh), so a
+    key names a result rather than a fixed content.
+    """
+
+    def __init__(self, directory=RESULT_STORE_DIR):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._datasets = {}
+        self._lock = threading.Lock()
+        self._remove_stale_files()
+
+    def _remove_stale_files(self):
+        # Includes .tmp files left behind by writes that never finished
+        cutoff = time.time() - SESSION_TTL
+        for pattern in ("*.sqlite", "*.tmp"):
+            for path in self.directory.glob(pattern):
+                if path.stat().st_mtime < cutoff:
+                    path.unlink(missing_ok=True)
+
+    def _path(self, key):
+        return self.directory / f"{key}.sqlite"
+
+    def put(self, case_data, charges, rule_pack=DEFAULT_RULE_PACK):
+        """
+        Stores a result (case-level and charge-level frames, evaluated with
+        rule_pack) and returns its key, holding one reference.
+        """
+        key = dataset_key(case_data, charges)
+        with self._lock:
+            published = key in self._datasets
+            if published:
+                self._acquire(key)
+        if published:
+            return key
+
+        # Writing the file and building the search index and cube take seconds,
+        # so they run outside the lock; only publishing the result holds it
+        tmp_path, meta = self._write(key, case_data, charges, rule_pack)
+        with self._lock:
+            if key in self._datasets:
+                tmp_path.unlink(missing_ok=True)  # another session stored it first
+            else:
+                os.replace(tmp_path, self._path(key))
+                self._datasets[key] = meta
+            self._acquire(key)
+        return key
+
+    def _acquire(self, key):
+        self._datasets[key]["refs"] += 1
+        self._datasets[key]["last_access"] = time.time()
+        self._evict()
+
+    def _write(self, key, case_data, charges, rule_pack):
+        """Writes a result to a private .tmp file and builds its metadata; returns (tmp path, metadata)."""
+        eligible = case_data["Eligibility"].str.startswith(
+            ELIGIBLE_PREFIX, na=False).to_numpy(dtype=bool)
+        tmp_path = self._path(key).with_suffix(f".{uuid.uuid4().hex}.tmp")
+        try:
+            with sqlite3.connect(tmp_path) as conn:
+                case_data.assign(**{"Is Eligible": eligible}).to_sql(
+                    "cases", conn, index=False, if_exists="replace")
+                charges.to_sql("charges", conn, index=False,
+                               if_exists="replace", chunksize=50_000)
+                conn.execute('CREATE INDEX idx_cases_eligible ON cases ("Is Eligible")')
+                conn.execute('CREATE INDEX idx_cases_number ON cases ("Case Number")')
+                conn.execute('CREATE INDEX idx_charges_number ON charges ("Case Number")')
+            conn.close()
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        waiting = charges["Eligibility"].str.startswith(WAITING_PREFIX, na=False)
+        due_dates = (charges.loc[waiting, "Eligibility Date"]
+                     if "Eligibility Date" in charges else pd.Series(dtype="datetime64[us]"))
+        return tmp_path, {
+            "refs": 0,
+            "readers": 0,
+            "last_access": time.time(),
+            "rule_pack": rule_pack,
+            # Distinct dates on which waiting cases become due for re-evaluation
+            "due_dates": np.sort(pd.to_datetime(due_dates).dropna().unique()),
+            "refresh_lock": threading.Lock(),
+            "date_columns": {
+                name: [col for col in df.columns
+                       if pd.api.types.is_datetime64_any_dtype(df[col])]
+                for name, df in (("cases", case_data), ("charges", charges))
+            },
+            "summary": {
+                "total": len(case_data),
+                "eligible": int(np.count_nonzero(eligible)),
+                "as_of": date.today().isoformat(),
+            },
+            "search_index": SearchIndex(case_data, charges),
+            "cube": build_cube(charges),
+        }
+
+    def _evict(self):
+        now = time.time()
+        expired = [key for key, meta in self._datasets.items()
+                   if now - meta["last_access"] > SESSION_TTL]
+        unreferenced = sorted(
+            (key for key, meta in self._datasets.items()
+             if meta["refs"] <= 0 and key not in expired),
+            key=lambda key: self._datasets[key]["last_access"],
+        )
+        for key in expired + unreferenced[:-MAX_UNREFERENCED or None]:
+            if self._datasets[key]["readers"]:
+                continue  # evicted once its last read finishes
+            del self._datasets[key]
+            self._path(key).unlink(missing_ok=True)
+
+    def release(self, key):
+        """Drops one reference to a result; unreferenced results become evictable."""
+        with self._lock:
+            if key in self._datasets:
+                self._datasets[key]["refs"] -= 1
+            self._evict()
+
+    def exists(self, key):
+        return key in self._datasets
+
+    def summary(self, key):
+        """
+        Returns precomputed totals ({"total", "eligible", "as_of"}, as_of being
+        the date eligibility was last evaluated for) without touching disk.
+        """
+        return self._touch(key)["summary"]
+
+    def cube(self, key):
+        """Returns the result's aggregate cube (see utils/cube.py) without touching disk."""
+        return self._touch(key)["cube"]
+
+    def search(self, key, query, limit=20):
+        """Ranked case matches for a name, alias, case number or case title query; see SearchIndex."""
+        return self._touch(key)["search_index"].search(query, limit)
+
+    def refresh(self, key, today=None):
+        """
+        Re-evaluates the result's waiting cases whose wait has ended by today
+        and applies them to the stored rows, the summary, the search index and
+        the cube (incrementally, with update_cube). Only those cases are read
+        back and re-evaluated: exclusions and blockers do not depend on the
+        date, so the rest of the result cannot change. Returns the number of
+        cases re-evaluated.
+        """
+        today = pd.Timestamp(today or date.today()).normalize()
+        with self._lock:
+            meta = self._touch(key)
+            if not self._is_due(meta, today):
+                return 0
+            meta["readers"] += 1
+        try:
+            with meta["refresh_lock"]:
+                if not self._is_due(meta, today):
+                    return 0  # another session refreshed it first
+                old = self._query(
+                    key, "charges",
+                    'WHERE "Case Number" IN (SELECT "Case Number" FROM charges '
+                    'WHERE "Eligibility" LIKE ? AND "Eligibility Date" <= ?)',
+                    (WAITING_PREFIX + "%", str(today)))
+                new = determine_eligibility(old.copy(), meta["rule_pack"], today)
+                eligibility = new.drop_duplicates("Case Number").set_index(
+                    "Case Number")["Eligibility"]
+                self._rewrite(key, new, eligibility)
+
+                newly_eligible = int(
+                    eligibility.str.startswith(ELIGIBLE_PREFIX, na=False).sum()
+                    - old.drop_duplicates("Case Number")["Eligibility"]
+                    .str.startswith(ELIGIBLE_PREFIX, na=False).sum())
+                with self._lock:
+                    meta["cube"] = update_cube(meta["cube"], old, new)
+                    meta["search_index"].update_eligibility(eligibility)
+                    meta["summary"] = dict(
+                        meta["summary"], eligible=meta["summary"]["eligible"] + newly_eligible,
+                        as_of=today.date().isoformat())
+                    meta["due_dates"] = meta["due_dates"][meta["due_dates"] > today]
+                return len(eligibility)
+        finally:
+            with self._lock:
+                meta["readers"] -= 1
+                self._evict()
+
+    @staticmethod
+    def _is_due(meta, today):
+        return len(meta["due_dates"]) > 0 and meta["due_dates"][0] <= today
+
+    def _rewrite(self, key, charges, eligibility):
+        """Replaces re-evaluated cases' charge rows and case eligibility in the result's file, in one transaction."""
+        conn = sqlite3.connect(self._path(key), timeout=60)
+        try:
+            conn.executemany(
+                'UPDATE cases SET "Eligibility" = ?, "Is Eligible" = ? WHERE "Case Number" = ?',
+                [(text, int(str(text).startswith(ELIGIBLE_PREFIX)), number)
+                 for number, text in eligibility.items()])
+            conn.executemany('DELETE FROM charges WHERE "Case Number" = ?',
+                             [(number,) for number in eligibility.index])
+            # to_sql commits the updates and deletes above along with the new rows
+            charges.to_sql("charges", conn, index=False, if_exists="append")
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _touch(self, key):
+        meta = self._datasets.get(key)
+        if meta is None:
+            raise KeyError(f"Result {key} has expired")
+        meta["last_access"] = time.time()
+        return meta
+
+    def _query(self, key, table, where="", params=(), suffix=""):
+        # The reader count keeps the file from being evicted mid-read, and
+        # read-only mode fails rather than creating an empty database
+        with self._lock:
+            meta = self._touch(key)
+            meta["readers"] += 1
+        try:
+            conn = sqlite3.connect(self._path(key).resolve().as_uri() + "?mode=ro", uri=True)
+            try:
+                df = pd.read_sql_query(
+                    f'SELECT * FROM {table} {where} ORDER BY rowid {suffix}', conn,
+                    params=params, parse_dates=meta["date_columns"][table])
+            finally:
+                conn.close()
+        finally:
+            with self._lock:
+                meta["readers"] -= 1
+                self._evict()
+        return df.drop(columns="Is Eligible", errors="ignore")
+
+    @staticmethod
+    def _eligible_filter(eligible):
+        if eligible is None:
+            return "", ()
+        return 'WHERE "Is Eligible" = ?', (int(eligible),)
+
+    def count_cases(self, key, eligible=None):
+        """Counts cases from the precomputed summary, without touching disk."""
+        summary = self.summary(key)
+        if eligible is None:
+            return summary["total"]
+        return summary["eligible"] if eligible else summary["total"] - summary["eligible"]
+
+    def read_cases(self, key, eligible=None, offset=0, limit=None):
+        """Reads case-level rows, optionally only (in)eligible ones, one page at a time."""
+        where, params = self._eligible_filter(eligible)
+        suffix = "LIMIT ? OFFSET ?" if limit is not None else ""
+        if limit is not None:
+            params = params + (limit, offset)
+        return self._query(key, "cases", where, params, suffix)
+
+    def read_case(self, key, case_number):
+        return self._query(key, "cases", 'WHERE "Case Number" = ?', (case_number,))
+
+    def read_charges(self, key, case_number):
+        return self._query(key, "charges", 'WHERE "Case Number" = ?', (case_number,))
+
+
+@lru_cache(maxsize=1)
+def get_result_store():
+    """Returns the process-wide ResultStore, creating its directory on first use."""
+    return ResultStore()
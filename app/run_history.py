@@ -0,0 +1,169 @@
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from utils.constants import DEFAULT_RULE_PACK
+
+# Under the project root by default, so runs started from any directory share one history
+RUN_HISTORY_DB = os.environ.get(
+    "RUN_HISTORY_DB", str(Path(__file__).resolve().parent.parent / "run_history.sqlite"))
+
+CHANGE_TYPES = ["Newly Eligible", "Newly Blocked", "Wait Date Changed"]
+STATUS_PREFIXES = {"✅": "eligible", "⏳": "waiting", "❌": "blocked"}
+
+
+def connect(path=RUN_HISTORY_DB):
+    """
+    Opens the run history database, creating its tables on first use.
+    Each run stores only the cases whose eligibility changed since the previous
+    run of the same source (or a tombstone for cases that disappeared), so a
+    run's full state is the latest row per case up to that run.
+    """
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TEXT,
+            source TEXT,
+            rule_pack TEXT,
+            case_count INTEGER,
+            changed_count INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS case_results (
+            run_id INTEGER,
+            case_number TEXT,
+            eligibility TEXT,
+            removed INTEGER DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_case_results_run ON case_results (run_id);
+    """)
+    return conn
+
+
+def list_runs(conn):
+    """Returns all runs, newest first."""
+    return pd.read_sql_query("SELECT * FROM runs ORDER BY run_id DESC", conn)
+
+
+def load_runs(conn, run_ids):
+    """
+    Rebuilds several runs' case-level results (Case Number, Eligibility),
+    sorted by Case Number, as {run_id: DataFrame}. Each source's deltas are
+    read once, however many of its runs are requested.
+    """
+    run_ids = sorted(set(run_ids))
+    runs = pd.read_sql_query(
+        f"SELECT run_id, source FROM runs WHERE run_id IN ({', '.join('?' * len(run_ids))})",
+        conn, params=run_ids)
+    missing = set(run_ids) - set(runs["run_id"])
+    if missing:
+        raise KeyError(f"Run {min(missing)} does not exist")
+
+    results = {}
+    for source, ids in runs.groupby("source")["run_id"]:
+        deltas = pd.read_sql_query(
+            "SELECT run_id, case_number, eligibility, removed FROM case_results "
+            "WHERE run_id IN (SELECT run_id FROM runs WHERE source = ? AND run_id <= ?) "
+            "ORDER BY run_id",
+            conn, params=(source, int(ids.max())))
+        for run_id in ids:
+            latest = deltas[deltas["run_id"] <= run_id].drop_duplicates(
+                "case_number", keep="last")
+            latest = latest[latest["removed"] == 0].sort_values("case_number")
+            results[run_id] = pd.DataFrame({
+                "Case Number": latest["case_number"].to_numpy(),
+                "Eligibility": latest["eligibility"].to_numpy(),
+            })
+    return results
+
+
+def load_run(conn, run_id):
+    """Rebuilds one run's case-level results; see load_runs."""
+    return load_runs(conn, [run_id])[run_id]
+
+
+def record_run(conn, case_data, source, rule_pack=DEFAULT_RULE_PACK):
+    """
+    Saves a run's case-level results under a new run ID and returns it. Only
+    cases that are new, changed or removed since the source's previous run
+    are written. The previous run is read and the new one written in one
+    write transaction, so concurrent runs of a source are chained in order.
+    """
+    after = case_data[["Case Number", "Eligibility"]].astype(str).sort_values("Case Number")
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        previous = conn.execute(
+            "SELECT MAX(run_id) FROM runs WHERE source = ?", (source,)).fetchone()[0]
+        before = load_run(conn, previous) if previous else pd.DataFrame(
+            columns=["Case Number", "Eligibility"])
+
+        merged = before.merge(after, on="Case Number", how="outer",
+                              suffixes=(" Before", ""), indicator=True)
+        removed = merged["_merge"] == "left_only"
+        changed = (merged["_merge"] == "right_only") | (
+            (merged["_merge"] == "both")
+            & (merged["Eligibility Before"] != merged["Eligibility"]))
+        deltas = merged[changed | removed]
+
+        cursor = conn.execute(
+            "INSERT INTO runs (created_at, source, rule_pack, case_count, changed_count) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (datetime.now().isoformat(timespec="seconds"), source, rule_pack,
+             len(after), len(deltas)))
+        run_id = cursor.lastrowid
+
+        conn.executemany(
+            "INSERT INTO case_results (run_id, case_number, eligibility, removed) "
+            "VALUES (?, ?, ?, ?)",
+            zip([run_id] * len(deltas), deltas["Case Number"].tolist(),
+                deltas["Eligibility"].where(deltas["Eligibility"].notna(), None).tolist(),
+                removed[changed | removed].astype(int).tolist()))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return run_id
+
+
+def _status(eligibility):
+    return eligibility.str[:1].map(STATUS_PREFIXES)
+
+
+def diff_results(before, after):
+    """
+    Compares two case-level results (Case Number, Eligibility) and returns one
+    row per changed case with its Change type: newly eligible, newly blocked,
+    or a changed wait date.
+    """
+    merged = before.sort_values("Case Number").merge(
+        after.sort_values("Case Number"), on="Case Number", how="right",
+        suffixes=(" Before", ""))
+    # Only cases whose eligibility text changed can have a change type
+    merged = merged[merged["Eligibility Before"] != merged["Eligibility"]]
+    status_before = _status(merged["Eligibility Before"].fillna(""))
+    status_after = _status(merged["Eligibility"])
+
+    wait_pattern = r"Wait until (\d{4}-\d{2}-\d{2})"
+    merged["Wait Date Before"] = merged["Eligibility Before"].str.extract(
+        wait_pattern, expand=False)
+    merged["Wait Date"] = merged["Eligibility"].str.extract(wait_pattern, expand=False)
+
+    conditions = [
+        (status_after == "eligible") & (status_before != "eligible"),
+        (status_after == "blocked") & (status_before != "blocked"),
+        (status_after == "waiting") & (status_before == "waiting")
+        & (merged["Wait Date Before"] != merged["Wait Date"]),
+    ]
+    merged["Change"] = np.select(
+        [c.to_numpy(dtype=bool) for c in conditions], CHANGE_TYPES, default="")
+    changes = merged[merged["Change"] != ""]
+    return changes[["Case Number", "Change", "Eligibility Before", "Eligibility",
+                    "Wait Date Before", "Wait Date"]].reset_index(drop=True)
+
+
+def diff_runs(conn, old_run_id, new_run_id):
+    """Changes between two recorded runs; see diff_results."""
+    runs = load_runs(conn, [old_run_id, new_run_id])
+    return diff_results(runs[old_run_id], runs[new_run_id])
@@ -0,0 +1,144 @@
+from difflib import SequenceMatcher
+import numpy as np
+import pandas as pd
+
+# Words in nearly every case title that would otherwise match everything
+STOP_WORDS = {"THE", "STATE", "OF", "MARYLAND", "VS", "V", "NA"}
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+# Fuzzy matches score their similarity ratio, so always below prefix matches
+MIN_FUZZY_RATIO = 0.75
+MAX_FUZZY_CANDIDATES = 50
+
+
+def tokenize(values):
+    """Uppercase alphanumeric tokens of a string Series, one row per token (index kept)."""
+    tokens = (
+        values.astype("string").str.upper()
+        .str.replace(r"[^A-Z0-9]+", " ", regex=True)
+        .str.split().explode().dropna()
+    )
+    keep = ~tokens.isin(STOP_WORDS) & ((tokens.str.len() > 1) | tokens.str.isdigit())
+    return tokens[keep]
+
+
+def _trigrams(token):
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _postings(keys, values, n_keys):
+    """CSR layout: values grouped by key, with offsets[k]:offsets[k + 1] holding key k's values."""
+    order = np.argsort(keys, kind="stable")
+    offsets = np.r_[0, np.cumsum(np.bincount(keys, minlength=n_keys))]
+    return offsets, values[order]
+
+
+class SearchIndex:
+    """
+    In-memory search over a result's cases, built once when the result is
+    stored. Tokens from Name, Aliases, Case Number and Case Title are kept in
+    a sorted array, so a prefix query is a binary search whose matching tokens
+    (and their cases) are one contiguous slice; misspelled name tokens are
+    found through a trigram index over the distinct tokens.
+    """
+
+    def __init__(self, case_data, charges):
+        self.cases = case_data[["Case Number", "Name", "Eligibility"]].reset_index(drop=True)
+        position = pd.Index(self.cases["Case Number"])
+
+        case_fields = charges.drop_duplicates("Case Number").set_index("Case Number")
+        case_fields = case_fields.reindex(position)
+        fields = [self.cases["Name"], self.cases["Case Number"]] + [
+            pd.Series(case_fields[col].to_numpy(), dtype="string")
+            for col in ["Aliases", "Case Title"] if col in case_fields
+        ]
+        pairs = pd.concat([self._field_tokens(field) for field in fields]).drop_duplicates()
+
+        token_codes, self.tokens = pd.factorize(pairs["token"], sort=True)
+        self.tokens = np.asarray(self.tokens, dtype=str)
+        self.offsets, self.token_cases = _postings(
+            token_codes, pairs["case"].to_numpy(), len(self.tokens))
+
+        # Trigram index for fuzzy matching; case numbers are only prefix-matched
+        words = [(i, t) for i, t in enumerate(self.tokens) if t.isalpha() and len(t) > 2]
+        trigram_pairs = pd.DataFrame(
+            [(gram, i) for i, t in words for gram in _trigrams(t)],
+            columns=["gram", "token"])
+        gram_codes, self.grams = pd.factorize(trigram_pairs["gram"])
+        self.grams = pd.Index(self.grams)
+        self.gram_offsets, self.gram_tokens = _postings(
+            gram_codes, trigram_pairs["token"].to_numpy(dtype=np.int64), len(self.grams))
+
+    def update_eligibility(self, eligibility):
+        """Applies re-evaluated cases' Eligibility (a Series indexed by Case Number) to search results."""
+        cases = self.cases.copy()
+        changed = cases["Case Number"].isin(eligibility.index)
+        cases.loc[changed, "Eligibility"] = cases.loc[changed, "Case Number"].map(eligibility)
+        self.cases = cases
+
+    @staticmethod
+    def _field_tokens(field):
+        """(token, case) pairs for one field, tokenizing each distinct value once."""
+        codes, uniques = pd.factorize(field)
+        tokens = tokenize(pd.Series(uniques, dtype="string"))
+        tokens = pd.DataFrame({"code": tokens.index.to_numpy(),
+                               "token": tokens.to_numpy(dtype=object)})
+        cases = pd.DataFrame({"code": codes, "case": np.arange(len(codes))})
+        return cases.merge(tokens, on="code")[["token", "case"]]
+
+    def _fuzzy_tokens(self, query):
+        """Token ids within MIN_FUZZY_RATIO of the query, with their ratios, lowest first."""
+        grams = self.grams.get_indexer(list(_trigrams(query)))
+        grams = grams[grams >= 0]
+        if not len(grams):
+            return np.array([], dtype=np.int64), np.array([])
+        candidates = np.concatenate(
+            [self.gram_tokens[self.gram_offsets[g]:self.gram_offsets[g + 1]] for g in grams])
+        ids, shared = np.unique(candidates, return_counts=True)
+        ids = ids[np.argsort(-shared, kind="stable")[:MAX_FUZZY_CANDIDATES]]
+        ratios = np.array([SequenceMatcher(None, query, self.tokens[i]).ratio() for i in ids])
+        keep = ratios >= MIN_FUZZY_RATIO
+        order = np.argsort(ratios[keep])
+        return ids[keep][order], ratios[keep][order]
+
+    def _token_scores(self, query):
+        """Best score per case for one query token (0 where it does not match)."""
+        best = np.zeros(len(self.cases), dtype=np.float32)
+        if query.isalpha() and len(query) > 2:
+            ids, ratios = self._fuzzy_tokens(query)
+            for i, ratio in zip(ids, ratios):
+                best[self.token_cases[self.offsets[i]:self.offsets[i + 1]]] = ratio
+
+        # Higher scores are assigned last so each case keeps its best match
+        lo = np.searchsorted(self.tokens, query, side="left")
+        hi = np.searchsorted(self.tokens, query + "\uffff", side="left")
+        best[self.token_cases[self.offsets[lo]:self.offsets[hi]]] = PREFIX_SCORE
+        if lo < len(self.tokens) and self.tokens[lo] == query:
+            best[self.token_cases[self.offsets[lo]:self.offsets[lo + 1]]] = EXACT_SCORE
+        return best
+
+    def search(self, query, limit=20):
+        """
+        Returns up to limit cases (Case Number, Name, Eligibility, Score) ranked
+        by how many query words match and how closely: exact over prefix over
+        fuzzy. Cases matching every word come first.
+        """
+        words = tokenize(pd.Series([query])).tolist()
+        if not words:
+            return self.cases.iloc[0:0].assign(Score=[])
+
+        score = np.zeros(len(self.cases), dtype=np.float32)
+        matched = np.zeros(len(self.cases), dtype=np.int32)
+        for word in words:
+            best = self._token_scores(word)
+            score += best
+            matched += best > 0
+
+        # Rank by words matched, then score; earlier rows win ties
+        key = matched.astype(np.float64) * (EXACT_SCORE * len(words) + 1) + score
+        hits = np.flatnonzero(matched)
+        if len(hits) > limit:
+            hits = hits[np.argpartition(-key[hits], limit - 1)[:limit]]
+        hits = hits[np.lexsort((hits, -key[hits]))]
+        return self.cases.iloc[hits].assign(Score=score[hits]).reset_index(drop=True)
@@ -0,0 +1,298 @@
+"""
+HTTP eligibility service for case-management integrations.
+
+Keeps one processed dataset and the compiled rules in memory and answers:
+    GET  /cases/<case number>   eligibility and charges for one case
+    GET  /parties/<party id>    every case of the resolved person
+    POST /evaluate              ad-hoc evaluation of charge records
+    GET  /metrics               latency percentiles, throughput, batch sizes
+    GET  /health
+
+Concurrent /evaluate requests are micro-batched into one vectorized rule
+evaluation. Run from the repository root:
+    python -m app.service --port 8502 [--data-dir data]
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+import numpy as np
+import pandas as pd
+from app.processing import process_case_data
+from utils.constants import COLUMN_SPECS, DEFAULT_RULE_PACK
+from utils.data_loader import load_tables
+from utils.eligibility import categorize_charges
+from utils.rules import evaluate_rule_packs, get_plan
+from utils.schema import coerce_columns
+
+# Columns a POSTed charge record needs for rule evaluation. JSON dates are
+# expected in ISO 8601 (YYYY-MM-DD).
+EVALUATION_SPEC = {
+    col: dict(rules, format="ISO8601") if rules["dtype"] == "date" else rules
+    for col, rules in {
+        **{c: COLUMN_SPECS["cases"][c] for c in ["Case Number", "Case Type"]},
+        **{c: COLUMN_SPECS["charges"][c] for c in [
+            "Statute Code", "Charge Description", "Charge Class",
+            "Disposition", "Disposition Date"]},
+    }.items()
+}
+CASE_FIELDS = ["Case Number", "Name", "PersonID", "Case Type",
+               "Disposition Date", "Eligibility"]
+CHARGE_FIELDS = ["ChargeID", "Statute Code", "Charge Description", "Charge Class",
+                 "Disposition", "Disposition Date"]
+
+MAX_BATCH_WAIT = 0.005
+MAX_BATCH_ROWS = 100_000
+LATENCY_WINDOW = 10_000
+BATCH_SEPARATOR = "\x1f"
+
+
+def to_records(df):
+    """DataFrame rows as JSON-ready dicts (missing values become None)."""
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+
+class Metrics:
+    """Rolling per-route latencies plus request and batch counters."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.latencies = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self.requests = defaultdict(int)
+        self.batch_sizes = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def record(self, route, seconds):
+        with self._lock:
+            self.latencies[route].append(seconds)
+            self.requests[route] += 1
+
+    def record_batch(self, size):
+        with self._lock:
+            self.batch_sizes.append(size)
+
+    def snapshot(self):
+        with self._lock:
+            uptime = time.monotonic() - self.started
+            routes = {}
+            for route, values in self.latencies.items():
+                ms = np.array(values) * 1000
+                routes[route] = {
+                    "requests": self.requests[route],
+                    "p50_ms": round(float(np.percentile(ms, 50)), 3),
+                    "p99_ms": round(float(np.percentile(ms, 99)), 3),
+                    "throughput_rps": round(self.requests[route] / uptime, 1),
+                }
+            batches = list(self.batch_sizes)
+        return {
+            "uptime_s": round(uptime, 1),
+            "routes": routes,
+            "batches": len(batches),
+            "mean_batch_size": round(float(np.mean(batches)), 2) if batches else 0,
+        }
+
+
+class MicroBatcher:
+    """
+    Collects evaluation requests arriving within MAX_BATCH_WAIT of each other
+    and evaluates them together in one call, then hands each caller its rows.
+    """
+
+    def __init__(self, evaluate, metrics, max_wait=MAX_BATCH_WAIT, max_rows=MAX_BATCH_ROWS):
+        self.evaluate = evaluate
+        self.metrics = metrics
+        self.max_wait = max_wait
+        self.max_rows = max_rows
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, charges):
+        item = {"charges": charges, "done": threading.Event()}
+        self._queue.put(item)
+        item["done"].wait()
+        if "error" in item:
+            raise item["error"]
+        return item["result"]
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            rows = len(batch[0]["charges"])
+            deadline = time.monotonic() + self.max_wait
+            while rows < self.max_rows:
+                try:
+                    item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                batch.append(item)
+                rows += len(item["charges"])
+            self._process(batch)
+
+    def _process(self, batch):
+        self.metrics.record_batch(len(batch))
+        try:
+            # Prefix case numbers with the request index so requests can't collide
+            combined = pd.concat(
+                [item["charges"].assign(**{"Case Number": f"{i}{BATCH_SEPARATOR}"
+                                           + item["charges"]["Case Number"]})
+                 for i, item in enumerate(batch)],
+                ignore_index=True,
+            )
+            results = self.evaluate(combined)
+            keys = pd.Series(results.index).str.split(BATCH_SEPARATOR, n=1, expand=True)
+            results = results.reset_index(drop=True).assign(**{"Case Number": keys[1]})
+            request = keys[0].astype(int).to_numpy()
+            for i, item in enumerate(batch):
+                item["result"] = results[request == i]
+        except Exception as e:
+            for item in batch:
+                item["error"] = e
+        for item in batch:
+            item["done"].set()
+
+
+class EligibilityService:
+    """Processed dataset, lookup indexes and compiled rules held in memory."""
+
+    def __init__(self, parties_df, cases_df, charges_df, rule_pack=DEFAULT_RULE_PACK):
+        self.plan = get_plan(rule_pack)
+        case_data, charges = process_case_data(
+            parties_df, cases_df, charges_df, show_errors=False, rule_pack=rule_pack)
+        if case_data.empty:
+            raise ValueError("Dataset could not be processed")
+
+        self.case_data = case_data.set_index("Case Number", drop=False)
+        self.charges = charges
+        self.charge_rows = charges.groupby("Case Number").indices
+        self.person_cases = case_data.groupby("PersonID")["Case Number"].agg(list).to_dict()
+        # Taken from the merged charges: non-pandas backends don't add PersonID to parties_df
+        links = charges[["PartyID", "PersonID"]].dropna().drop_duplicates("PartyID")
+        self.party_person = dict(zip(links["PartyID"], links["PersonID"]))
+        self.metrics = Metrics()
+        self.batcher = MicroBatcher(self._evaluate, self.metrics)
+
+    def _evaluate(self, charges):
+        return evaluate_rule_packs(categorize_charges(charges), [self.plan])[self.plan["key"]]
+
+    def lookup_case(self, case_number):
+        if case_number not in self.case_data.index:
+            return None
+        case = to_records(self.case_data.loc[[case_number], CASE_FIELDS])[0]
+        rows = self.charge_rows.get(case_number, [])
+        case["Charges"] = to_records(self.charges.iloc[rows][CHARGE_FIELDS])
+        return case
+
+    def lookup_party(self, party_id):
+        person_id = self.party_person.get(party_id)
+        if person_id is None:
+            return None
+        case_numbers = self.person_cases.get(person_id, [])
+        return {
+            "PartyID": party_id,
+            "PersonID": int(person_id),
+            "Cases": to_records(self.case_data.loc[case_numbers, CASE_FIELDS]),
+        }
+
+    def evaluate_records(self, records):
+        charges = pd.DataFrame.from_records(records)
+        missing = [col for col in EVALUATION_SPEC if col not in charges.columns]
+        if missing:
+            raise ValueError(f"Charge records are missing fields: {', '.join(missing)}")
+        bad_values = coerce_columns(charges, EVALUATION_SPEC)
+        if bad_values:
+            raise ValueError(f"Unreadable values in: {', '.join(bad_values)}")
+        if charges["Case Number"].isna().any():
+            raise ValueError("Every charge record needs a Case Number")
+        result = self.batcher.submit(charges)
+        return to_records(result[["Case Number", "Eligibility", "Eligibility Date"]])
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """Routes requests to the server's EligibilityService and records latency."""
+
+    def _respond(self, route, status, body, started):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        self.server.service.metrics.record(route, time.perf_counter() - started)
+
+    def do_GET(self):
+        started = time.perf_counter()
+        service = self.server.service
+        path = urlsplit(self.path).path
+        parts = [unquote(p) for p in path.strip("/").split("/")]
+
+        if parts == ["health"]:
+            return self._respond("health", 200, {"status": "ok"}, started)
+        if parts == ["metrics"]:
+            return self._respond("metrics", 200, service.metrics.snapshot(), started)
+        if len(parts) == 2 and parts[0] == "cases":
+            case = service.lookup_case(parts[1])
+            if case is None:
+                return self._respond("cases", 404, {"error": "Case not found"}, started)
+            return self._respond("cases", 200, case, started)
+        if len(parts) == 2 and parts[0] == "parties" and parts[1].isdigit():
+            party = service.lookup_party(int(parts[1]))
+            if party is None:
+                return self._respond("parties", 404, {"error": "Party not found"}, started)
+            return self._respond("parties", 200, party, started)
+        return self._respond("unknown", 404, {"error": "Not found"}, started)
+
+    def do_POST(self):
+        started = time.perf_counter()
+        if urlsplit(self.path).path.rstrip("/") != "/evaluate":
+            return self._respond("unknown", 404, {"error": "Not found"}, started)
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            records = body.get("charges") if isinstance(body, dict) else None
+            if not records:
+                raise ValueError("Body must be {\"charges\": [...]}")
+            result = self.server.service.evaluate_records(records)
+        except ValueError as e:
+            return self._respond("evaluate", 400, {"error": str(e)}, started)
+        except Exception as e:
+            return self._respond("evaluate", 500, {"error": f"Evaluation failed: {e}"}, started)
+        return self._respond("evaluate", 200, {"cases": result}, started)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ServiceServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for bursts of concurrent clients; the default backlog is 5
+    request_queue_size = 256
+
+
+def create_server(service, host="127.0.0.1", port=8502):
+    """Creates (but does not start) a threaded HTTP server for the service."""
+    server = ServiceServer((host, port), ServiceHandler)
+    server.service = service
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--data-dir", help="Directory with parties/cases/charges CSVs "
+                                           "(defaults to the example data)")
+    parser.add_argument("--rule-pack", default=DEFAULT_RULE_PACK)
+    args = parser.parse_args()
+
+    service = EligibilityService(*load_tables(args.data_dir), rule_pack=args.rule_pack)
+    server = create_server(service, args.host, args.port)
+    print(f"Serving eligibility on http://{args.host}:{server.server_port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
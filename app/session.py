@@ -1,4 +1,8 @@
+import sqlite3
 import streamlit as st
+from app.db import parse_connection_string
+from app.result_store import get_result_store
+from app.run_history import connect, record_run
 from utils.constants import REQUIRED_COLUMNS
 
 
@@ -10,11 +14,8 @@ def initialize_session():
     if "file_processed" not in st.session_state:
         st.session_state["file_processed"] = False
 
-    if "case_data" not in st.session_state:
-        st.session_state["case_data"] = None
-
-    if "df" not in st.session_state:
-        st.session_state["df"] = None
+    if "result_handle" not in st.session_state:
+        st.session_state["result_handle"] = None
 
     if "selected_case" not in st.session_state:
         st.session_state["selected_case"] = None
@@ -32,19 +33,69 @@ def initialize_session():
         st.session_state["mysql_conn_info"] = None
     if "pending_mysql_load" not in st.session_state:
         st.session_state["pending_mysql_load"] = False
+    if "run_id" not in st.session_state:
+        st.session_state["run_id"] = None
+    if "upload_names" not in st.session_state:
+        st.session_state["upload_names"] = {}
+
+
+def store_result(case_data, df):
+    """Moves processed results into the shared result store, keeping only a handle in the session."""
+    release_result()
+    if case_data is None or case_data.empty:
+        return
+    st.session_state.result_handle = get_result_store().put(case_data, df)
+
+
+def run_source(data_source):
+    """
+    Names the dataset a run is over, so runs are only compared with earlier
+    runs of the same data: the uploaded file names, or the MySQL server and
+    database (without credentials).
+    """
+    if data_source == "Upload your own data":
+        names = st.session_state.get("upload_names", {})
+        return "upload:" + ",".join(names.get(file, "") for file in REQUIRED_COLUMNS)
+    if data_source == "Load from MySQL":
+        conn_info = parse_connection_string(st.session_state.get("mysql_conn_string") or "")
+        return f"mysql://{conn_info['host']}:{conn_info['port']}/{conn_info['database']}"
+    return data_source
+
+
+def record_result_run(case_data, data_source):
+    """Records this run's case-level results in the run history so later runs can be compared."""
+    st.session_state.run_id = None
+    if case_data is None or case_data.empty:
+        return
+    try:
+        conn = connect()
+        st.session_state.run_id = record_run(conn, case_data, run_source(data_source))
+        conn.close()
+    except sqlite3.Error as e:
+        st.warning(f"⚠️ Could not record this run in the run history: {e}")
+
+
+def release_result():
+    """Releases this session's reference to its stored result."""
+    handle = st.session_state.get("result_handle")
+    if handle is not None:
+        get_result_store().release(handle)
+    st.session_state.result_handle = None
 
 
 def reset_session_state():
     """Resets session state and prevents duplicate rerun triggers."""
     st.session_state.file_processed = False
-    st.session_state.case_data = None
-    st.session_state.df = None
+    release_result()
+    st.session_state.run_id = None
     st.session_state.selected_case = None
     st.session_state.uploaded_files = {file: None for file in REQUIRED_COLUMNS}
+    st.session_state.upload_names = {}
     st.session_state.show_schema = False
     st.session_state.use_example_data = st.session_state.data_source == "Use example data"
     st.session_state.eligibility_determined = False
     st.session_state.mysql_conn = None
+    st.session_state.mysql_row_counts = None
 
     # Ensure rerun is only called once to avoid duplicate reruns
     if not st.session_state.get("rerun_triggered", False):
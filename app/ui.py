@@ -1,26 +1,77 @@
 import streamlit as st
-from datetime import timedelta
-from utils.constants import NON_CONVICTION_TERMS, WAIT_PERIODS
+import pandas as pd
+from app.result_store import get_result_store
+from app.run_history import CHANGE_TYPES, connect, diff_runs, list_runs
+from utils.cube import CUBE_DIMENSIONS, slice_cube
+
+
+PAGE_SIZE = 50
+SEARCH_LIMIT = 20
+
+
+def get_result_handle():
+    """Returns this session's result handle, or None if there is none or it has expired."""
+    handle = st.session_state.get("result_handle")
+    if handle is not None and not get_result_store().exists(handle):
+        st.warning("⚠️ These results have expired. Please determine eligibility again.")
+        st.session_state.result_handle = None
+        return None
+    return handle
+
+
+def select_case(case_number):
+    """Button callback: opens (or, with None, closes) a case's details."""
+    st.session_state.selected_case = case_number
+
+
+def set_page(page_key, page):
+    """Button callback: moves a case table to another page."""
+    st.session_state[page_key] = page
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def eligible_cases_csv(handle, as_of):
+    """
+    CSV export of a result's eligible cases, cached per result and the date it
+    was last evaluated for (as_of changes whenever the store refreshes it).
+    """
+    return get_result_store().read_cases(handle, eligible=True).to_csv(index=False)
+
+
+@st.fragment
+def render_results():
+    """
+    Results area (summary, case list, case details) as one fragment: clicks
+    inside it rerun only this function, not the data source and upload logic
+    in app.py. Buttons update session state in callbacks, so the same run
+    already shows the new panel without calling st.rerun.
+    """
+    if st.session_state.selected_case is None:
+        render_summary()
+        render_run_changes()
+
+    render_case_list()
 
 
 def render_summary():
     """Displays a summary of total cases and eligibility."""
-    case_data = st.session_state.case_data
+    handle = get_result_handle()
 
-    if case_data is None or case_data.empty:
+    if handle is None:
         st.warning("⚠️ No cases to display. Please check your data.")
         return
 
-    total_cases = len(case_data)
-    eligible_cases = case_data[case_data["Eligibility"].str.startswith(
-        "✅ Eligible", na=False)]
-    ineligible_cases = case_data[~case_data["Eligibility"].str.startswith(
-        "✅ Eligible", na=False)]
+    store = get_result_store()
+    # Waiting cases whose wait has ended since the result was stored become eligible
+    store.refresh(handle)
+    summary = store.summary(handle)
+    total_cases = summary["total"]
+    eligible_count = summary["eligible"]
 
-    if not eligible_cases.empty:
+    if eligible_count:
         st.download_button(
             label="📥 Download Eligible Cases (CSV)",
-            data=eligible_cases.to_csv(index=False),
+            data=eligible_cases_csv(handle, summary["as_of"]),
             file_name="eligible_cases.csv",
             mime="text/csv"
         )
@@ -31,25 +82,94 @@ def render_summary():
         st.metric(label="📂 Total Cases", value=total_cases)
 
     with col2:
-        st.metric(label="✅ Eligible Cases", value=len(eligible_cases))
+        st.metric(label="✅ Eligible Cases", value=eligible_count)
 
     with col3:
-        st.metric(label="❌ Ineligible Cases", value=len(ineligible_cases))
+        st.metric(label="❌ Ineligible Cases", value=total_cases - eligible_count)
+
+    render_breakdown(store.cube(handle))
+
+
+def render_breakdown(cube):
+    """Eligibility breakdown dashboard; reads only the result's precomputed cube."""
+    with st.expander("📈 Eligibility Breakdown"):
+        by = st.selectbox("Break down by:", CUBE_DIMENSIONS, key="breakdown_by")
+
+        filters = {}
+        columns = st.columns(len(CUBE_DIMENSIONS))
+        for col, dim in zip(columns, CUBE_DIMENSIONS):
+            filters[dim] = col.multiselect(
+                dim, sorted(cube[dim].unique()), key=f"breakdown_filter_{dim}")
+
+        table = slice_cube(cube, filters, by)
+        if table.empty:
+            st.info("No cases match these filters.")
+            return
+        st.bar_chart(table)
+        st.dataframe(table, width="stretch")
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def load_run_changes(old_run_id, new_run_id):
+    """Diff between two recorded runs; runs never change, so the result is cached."""
+    conn = connect()
+    try:
+        return diff_runs(conn, old_run_id, new_run_id)
+    finally:
+        conn.close()
+
+
+def render_run_changes():
+    """Shows what changed since an earlier run of the same data source."""
+    run_id = st.session_state.get("run_id")
+    if run_id is None:
+        return
+
+    conn = connect()
+    runs = list_runs(conn)
+    conn.close()
+    source = runs.loc[runs["run_id"] == run_id, "source"]
+    earlier = runs[(runs["source"] == source.iloc[0]) & (runs["run_id"] < run_id)] \
+        if not source.empty else runs.iloc[0:0]
+    if earlier.empty:
+        return
+
+    st.subheader("🔁 Changes Since an Earlier Run")
+    labels = {
+        row.run_id: f"Run {row.run_id} ({row.created_at}, {row.case_count} cases)"
+        for row in earlier.itertuples()
+    }
+    old_run_id = st.selectbox(
+        "Compare with:", list(labels), format_func=labels.get, key="compare_run")
+    changes = load_run_changes(old_run_id, run_id)
+
+    columns = st.columns(len(CHANGE_TYPES))
+    counts = changes["Change"].value_counts()
+    for col, change in zip(columns, CHANGE_TYPES):
+        col.metric(label=change, value=int(counts.get(change, 0)))
+
+    if changes.empty:
+        st.info("No eligibility changes since that run.")
+    else:
+        st.dataframe(changes, hide_index=True, width="stretch")
 
 
 def render_case_list():
     """Displays a list of cases and case details when selected."""
-    case_data = st.session_state.case_data
+    handle = get_result_handle()
 
-    if case_data is None or case_data.empty:
+    if handle is None:
         st.warning("⚠️ No case data available.")
         return
 
+    store = get_result_store()
+
     if st.session_state.selected_case is None:
+        render_case_search(store, handle)
         st.subheader("📊 Case List")
 
-        def render_case_table(cases, title, key_prefix):
-            """Renders case list table."""
+        def render_case_table(eligible, title, key_prefix):
+            """Renders one page of the case list table, read from the result store."""
             st.subheader(title)
             col1, col2, col3, col4, col5, col6 = st.columns(
                 [0.15, 0.3, 0.2, 0.15, 0.15, 0.1])
@@ -60,6 +180,14 @@ def render_case_list():
             col5.write("**Eligibility**")
             col6.write("**View Details**")
 
+            total = store.count_cases(handle, eligible=eligible)
+            page_key = f"{key_prefix}_page"
+            page = min(st.session_state.get(page_key, 0),
+                       max(total - 1, 0) // PAGE_SIZE)
+            offset = page * PAGE_SIZE
+            cases = store.read_cases(
+                handle, eligible=eligible, offset=offset, limit=PAGE_SIZE)
+
             if cases.empty:
                 st.info(f"No {title.lower()} found.")
             else:
@@ -78,28 +206,60 @@ def render_case_list():
                         col4.write(f":red[{row['Disposition Date']}]")
                         col5.write(row['Eligibility'])
 
-                    if col6.button("🔍", key=f"{key_prefix}_{index}"):
-                        st.session_state.selected_case = row["Case Number"]
-                        st.rerun()
+                    col6.button("🔍", key=f"{key_prefix}_{offset + index}",
+                                on_click=select_case, args=(row["Case Number"],))
 
-        eligible_cases = case_data[case_data["Eligibility"].str.startswith(
-            "✅ Eligible", na=False)]
-        ineligible_cases = case_data[~case_data["Eligibility"].str.startswith(
-            "✅ Eligible", na=False)]
+            if total > PAGE_SIZE:
+                last_page = (total - 1) // PAGE_SIZE
+                col1, col2, col3 = st.columns([0.15, 0.7, 0.15])
+                col1.button("⬅️ Previous", key=f"{key_prefix}_prev", disabled=page == 0,
+                            on_click=set_page, args=(page_key, page - 1))
+                col2.write(
+                    f"Page {page + 1} of {last_page + 1} ({total} cases)")
+                col3.button("Next ➡️", key=f"{key_prefix}_next", disabled=page == last_page,
+                            on_click=set_page, args=(page_key, page + 1))
 
-        render_case_table(eligible_cases, "✅ Eligible Cases", "eligible_case")
-        render_case_table(ineligible_cases,
-                          "❌ Ineligible Cases", "ineligible_case")
+        render_case_table(True, "✅ Eligible Cases", "eligible_case")
+        render_case_table(False, "❌ Ineligible Cases", "ineligible_case")
 
     else:
         render_case_details()
 
 
+def render_case_search(store, handle):
+    """Search box over names, aliases, case numbers and case titles, using the result's prebuilt index."""
+    query = st.text_input(
+        "🔎 Search cases", key="case_search",
+        placeholder="Name, alias, case number or case title (partial or misspelled is fine)")
+    if not query.strip():
+        return
+
+    matches = store.search(handle, query, limit=SEARCH_LIMIT)
+    if matches.empty:
+        st.info(f"No cases match \"{query}\".")
+        return
+
+    st.caption(f"Best matches ({len(matches)})")
+    for index, row in matches.iterrows():
+        col1, col2, col3, col4 = st.columns([0.15, 0.3, 0.45, 0.1])
+        col1.write(f"**{row['Case Number']}**")
+        col2.write(row['Name'])
+        if row['Eligibility'].startswith("✅"):
+            col3.write(f":green[{row['Eligibility']}]")
+        else:
+            col3.write(row['Eligibility'])
+        col4.button("🔍", key=f"search_{index}",
+                    on_click=select_case, args=(row["Case Number"],))
+
+
 def render_case_details():
     """Displays details for a selected case."""
-    case_data = st.session_state.case_data
-    case_details = case_data[case_data["Case Number"]
-                             == st.session_state.selected_case]
+    handle = get_result_handle()
+    if handle is None:
+        return
+
+    store = get_result_store()
+    case_details = store.read_case(handle, st.session_state.selected_case)
 
     if case_details.empty:
         st.error("❌ No case details found.")
@@ -122,8 +282,7 @@ def render_case_details():
         col2.write(f"**Eligibility:** {row['Eligibility']}")
 
     # Retrieve charge details for this case
-    case_charges = st.session_state.df[st.session_state.df["Case Number"]
-                                       == st.session_state.selected_case]
+    case_charges = store.read_charges(handle, st.session_state.selected_case)
 
     if not case_charges.empty:
         st.subheader("⚖️ Charges for this Case")
@@ -150,64 +309,30 @@ def render_case_details():
             </style>
         """, unsafe_allow_html=True)
 
-        # Determine the most relevant disposition date based on eligibility calculation
-        # The most relevant date is the one that determines when the case becomes eligible
-        # This is calculated as: disposition_date + applicable_wait_period
-        def is_non_conviction(disposition):
-            """Check if a disposition is a non-conviction."""
-            if not disposition or str(disposition).strip() == "":
-                return False
-            return any(term in str(disposition).upper() for term in NON_CONVICTION_TERMS)
-
-        def calculate_eligibility_date(row):
-            """Calculate when a charge becomes eligible based on disposition and wait period."""
-            if not row["Disposition Date"] or str(row["Disposition Date"]).strip() == "":
-                return None
-
-            # Determine if this is a non-conviction
-            if is_non_conviction(row["Disposition"]):
-                wait_days = WAIT_PERIODS["non_conviction"]
-            else:
-                wait_days = WAIT_PERIODS["misdemeanor"]
-
-            return row["Disposition Date"] + timedelta(days=wait_days)
-
-        # Filter charges with valid disposition dates and calculate eligibility dates
-        valid_charges = case_charges[case_charges["Disposition Date"].notna()].copy()
-        valid_charges["eligibility_date"] = valid_charges.apply(calculate_eligibility_date, axis=1)
-
-        # The most relevant date is the one with the LATEST eligibility date (determines case eligibility)
-        most_relevant_eligibility_date = valid_charges["eligibility_date"].max() if not valid_charges.empty else None
-
-        # Find the disposition date that corresponds to the most relevant eligibility date
-        if most_relevant_eligibility_date:
-            most_relevant_row = valid_charges[valid_charges["eligibility_date"] == most_relevant_eligibility_date].iloc[0]
-            most_relevant_disposition_date = most_relevant_row["Disposition Date"]
-        else:
-            most_relevant_disposition_date = None
-
-        all_same_disposition = valid_charges["Disposition Date"].nunique() == 1 if not valid_charges.empty else True
-
-        from datetime import datetime
-        today = datetime.today()
+        # Each charge's eligibility date and rule come from the rule pack that
+        # evaluated the case; the case's most relevant disposition date is the
+        # one of the charge with the latest eligibility date
+        dispositions = case_charges["Disposition Date"].dropna()
+        all_same_disposition = dispositions.nunique() <= 1
+        today = pd.Timestamp.today()
 
         # Check if the overall case is eligible
         case_is_eligible = row['Eligibility'].startswith("✅")
 
         for _, charge_row in case_charges.iterrows():
-            is_most_relevant = charge_row["Disposition Date"] == most_relevant_disposition_date
+            is_most_relevant = (
+                charge_row["Disposition Date"] == charge_row["Most Relevant Disposition Date"])
 
-            # Determine charge type label
-            is_charge_non_conviction = is_non_conviction(charge_row["Disposition"])
-            if is_charge_non_conviction:
-                charge_type_label = f"Non-Conviction - {charge_row['Charge Class']}"
+            # Label the charge with the rule applied to it, e.g. Non-Conviction
+            if pd.notna(charge_row["Charge Rule"]):
+                charge_type_label = f"{charge_row['Charge Rule']} - {charge_row['Charge Class']}"
             else:
                 charge_type_label = charge_row['Charge Class']
 
-            # Calculate if this individual charge is eligible
             # A charge is only eligible if both the charge's waiting period has passed AND the case is eligible
-            charge_eligibility_date = calculate_eligibility_date(charge_row)
-            charge_waiting_period_passed = charge_eligibility_date and today >= charge_eligibility_date
+            charge_eligibility_date = charge_row["Charge Eligibility Date"]
+            charge_waiting_period_passed = (
+                pd.notna(charge_eligibility_date) and today >= charge_eligibility_date)
             is_charge_eligible = case_is_eligible and charge_waiting_period_passed
 
             disposition_label = f"({charge_row['Disposition Date'].strftime('%Y-%m-%d')})"
@@ -237,9 +362,7 @@ def render_case_details():
                 else:
                     col2.write(f"**Disposition Date:** {charge_row['Disposition Date'].strftime('%Y-%m-%d')}")
 
-    if st.button("🔙 Back to Case List"):
-        st.session_state.selected_case = None
-        st.rerun()
+    st.button("🔙 Back to Case List", on_click=select_case, args=(None,))
 
 
 def render_synthetic_data_notice():
@@ -0,0 +1,65 @@
+"""
+Runs the eligibility pipeline on each installed execution backend (see
+app/backends.py) straight from CSV files at several dataset sizes, checks
+that every backend returns exactly the pandas results, and prints timings.
+
+Run from the repository root:
+    python -m benchmarks.bench_backends
+"""
+import tempfile
+import time
+from pathlib import Path
+from pandas.testing import assert_frame_equal
+from app.backends import BACKENDS, get_backend
+from app.processing import process_case_data
+from benchmarks.synthetic import generate_tables
+from utils.data_loader import DATA_DIR
+
+SIZES = [10_000, 100_000, 1_000_000]
+TABLES = ["parties", "cases", "charges"]
+
+
+def available_backends():
+    names = []
+    for name in BACKENDS:
+        try:
+            get_backend(name).close()
+        except ImportError as e:
+            print(f"skipping {name}: {e}")
+            continue
+        names.append(name)
+    return names
+
+
+def run(backend, paths):
+    start = time.perf_counter()
+    case_data, charges = process_case_data(*paths, show_errors=False, backend=backend)
+    return case_data, charges, time.perf_counter() - start
+
+
+def compare(label, paths, backends):
+    """Times each backend on the same files and checks its results equal pandas'."""
+    timings = {}
+    expected = None
+    for backend in backends:
+        case_data, charges, timings[backend] = run(backend, paths)
+        if expected is None:
+            expected = (case_data, charges)
+            continue
+        assert_frame_equal(expected[0], case_data, obj=f"{backend} case data")
+        assert_frame_equal(expected[1], charges, obj=f"{backend} charges")
+    print(f"{label:<18}" + "".join(f"{timings[b]:>11.2f} s" for b in backends))
+
+
+if __name__ == "__main__":
+    backends = available_backends()
+    print(f"\n{'dataset':<18}" + "".join(f"{b:>13}" for b in backends))
+    compare("example data", [DATA_DIR / f"{t}.csv" for t in TABLES], backends)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in SIZES:
+            paths = [Path(directory) / f"{t}.csv" for t in TABLES]
+            for path, table in zip(paths, generate_tables(size)):
+                table.to_csv(path, index=False)
+            compare(f"{size:,} charges", paths, backends)
+    print("\nAll backends returned identical results.")
@@ -0,0 +1,87 @@
+"""
+Shows the effect of the secondary indexes from app.db.SECONDARY_INDEXES on the
+app's database access paths. An SQLite file stands in for MySQL: the same
+table DDL and CREATE INDEX statements are used, and each query's plan (EXPLAIN
+QUERY PLAN) and timing are reported before and after the indexes are added.
+
+Run from the repository root:
+    python -m benchmarks.bench_indexes
+"""
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from app.db import SECONDARY_INDEXES, TABLE_DEFINITIONS, index_ddl
+from benchmarks.synthetic import generate_tables
+from utils.schema import apply_schema
+
+N_CHARGES = 500_000
+REPEAT = 50
+
+QUERIES = {
+    "write-back (mark_case_eligible)": (
+        "UPDATE cases SET eligible = TRUE WHERE `Case Number` = ?", ["case_number"]),
+    "charges for a case": (
+        "SELECT * FROM charges WHERE CaseID = ?", ["case_id"]),
+    "cases for a party": (
+        "SELECT * FROM cases WHERE PartyID = ?", ["party_id"]),
+    "class/date pushdown join": (
+        "SELECT cases.`Case Number`, charges.ChargeID FROM charges "
+        "JOIN cases ON cases.CaseID = charges.CaseID "
+        "WHERE charges.`Charge Class` = ? AND charges.`Disposition Date` < ?",
+        ["charge_class", "cutoff"]),
+}
+
+
+def load(conn):
+    for ddl in TABLE_DEFINITIONS.values():
+        conn.execute(ddl)
+    for table, df in zip(["parties", "cases", "charges"], generate_tables(N_CHARGES)):
+        apply_schema(df, table)
+        for col in df.columns:
+            if df[col].dtype.kind == "M":
+                df[col] = df[col].dt.strftime("%Y-%m-%d")
+        df.to_sql(table, conn, if_exists="append", index=False)
+    conn.commit()
+
+
+def run(conn, params):
+    for label, (sql, names) in QUERIES.items():
+        values = tuple(params[name] for name in names)
+        plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", values).fetchall()
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            conn.execute(sql, values).fetchall()
+        elapsed = (time.perf_counter() - start) / REPEAT * 1000
+        print(f"  {label:<34}{elapsed:>10.2f} ms")
+        for row in plan:
+            print(f"      {row[-1]}")
+    conn.rollback()
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(Path(tmp) / "standin.sqlite")
+        load(conn)
+        params = {
+            "case_number": conn.execute("SELECT `Case Number` FROM cases LIMIT 1 OFFSET 777").fetchone()[0],
+            "case_id": 777,
+            "party_id": 777,
+            # apply_schema stores Charge Class upper-cased
+            "charge_class": "MISDEMEANOR",
+            "cutoff": "1986-01-01",
+        }
+
+        print(f"Before indexes ({N_CHARGES} charges, mean of {REPEAT} runs)")
+        run(conn, params)
+
+        start = time.perf_counter()
+        for table, indexes in SECONDARY_INDEXES.items():
+            for name, columns in indexes.items():
+                conn.execute(index_ddl(table, name, columns))
+        conn.commit()
+        print(f"\nIndexes built in {time.perf_counter() - start:.2f} s")
+
+        print("\nAfter indexes")
+        run(conn, params)
+        conn.close()
@@ -0,0 +1,88 @@
+"""
+Measures Streamlit interaction latency on a large stored result: opening a
+case, going back to the list, and paging the ineligible table.
+
+Each interaction is timed twice: as a full script run of app.py (what every
+click cost before the results area became a fragment, and what AppTest
+always executes), and as a run of only the results fragment
+(app.ui.render_results), which is what the server reruns for clicks inside it.
+
+Run from the repository root:
+    python -m benchmarks.bench_interactions
+"""
+import time
+from pathlib import Path
+import numpy as np
+from streamlit.testing.v1 import AppTest
+from app.processing import process_case_data
+from app.result_store import get_result_store
+from benchmarks.synthetic import generate_tables
+
+ROOT = Path(__file__).resolve().parent.parent
+N_CHARGES = 500_000
+REPEATS = 5
+
+
+def render_results_only():
+    from app.ui import render_results
+    render_results()
+
+
+def open_app(script, handle):
+    at = script(default_timeout=120)
+    at.session_state["data_source"] = "Use example data"
+    at.session_state["file_processed"] = True
+    at.session_state["result_handle"] = handle
+    at.session_state["selected_case"] = None
+    at.session_state["run_id"] = None
+    return at.run()
+
+
+def timed(at, action):
+    start = time.perf_counter()
+    action(at).run()
+    assert not at.exception, [e.value for e in at.exception]
+    return time.perf_counter() - start
+
+
+def back_button(at):
+    return next(b for b in at.button if b.label.startswith("🔙"))
+
+
+def first_case_button(at):
+    return next(b for b in at.button
+                if (b.key or "").removeprefix("ineligible_case_").isdigit())
+
+
+INTERACTIONS = {
+    "open case": lambda at: first_case_button(at).click(),
+    "back to list": lambda at: back_button(at).click(),
+    "next page": lambda at: at.button(key="ineligible_case_next").click(),
+}
+
+
+def measure(script, handle):
+    at = open_app(script, handle)
+    timings = {name: [] for name in INTERACTIONS}
+    for _ in range(REPEATS):
+        for name, action in INTERACTIONS.items():
+            timings[name].append(timed(at, action))
+    return {name: np.median(values) * 1000 for name, values in timings.items()}
+
+
+if __name__ == "__main__":
+    case_data, charges = process_case_data(
+        *generate_tables(N_CHARGES), show_errors=False)
+    handle = get_result_store().put(case_data, charges)
+    print(f"{len(case_data)} cases, {len(charges)} charges")
+
+    scripts = {
+        "full app.py rerun": lambda **kw: AppTest.from_file(str(ROOT / "app.py"), **kw),
+        "results fragment only": lambda **kw: AppTest.from_function(render_results_only, **kw),
+    }
+
+    print(f"\n{'interaction':<16}" + "".join(f"{label:>26}" for label in scripts))
+    results = {label: measure(script, handle) for label, script in scripts.items()}
+    for name in INTERACTIONS:
+        print(f"{name:<16}" + "".join(
+            f"{results[label][name]:>23.1f} ms" for label in scripts))
@@ -0,0 +1,53 @@
+"""
+Measures rule-pack evaluation on synthetic data: one pack, and several pack
+versions evaluated side by side on the same loaded frame.
+
+Run from the repository root:
+    python -m benchmarks.bench_rules
+"""
+import copy
+import time
+from benchmarks.synthetic import generate_tables
+from utils.constants import MARYLAND_RULE_PACK
+from utils.eligibility import categorize_charges
+from utils.rules import compile_rule_pack, evaluate_rule_packs
+from utils.schema import apply_schema
+
+SIZES = [10_000, 100_000, 1_000_000]
+VERSIONS = 4
+
+
+def prepare(n_charges):
+    parties, cases, charges = generate_tables(n_charges)
+    for df, table in [(parties, "parties"), (cases, "cases"), (charges, "charges")]:
+        apply_schema(df, table)
+    merged = charges.merge(cases, on="CaseID", how="left").merge(
+        parties, on="PartyID", how="left")
+    return categorize_charges(merged)
+
+
+def pack_versions(count):
+    packs = []
+    for i in range(count):
+        pack = copy.deepcopy(MARYLAND_RULE_PACK)
+        pack["version"] = f"bench.{i}"
+        for period in pack["waiting_periods"]:
+            period["days"] += 365 * i
+        packs.append(compile_rule_pack(pack))
+    return packs
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    plans = pack_versions(VERSIONS)
+    print(f"{'charges':>10}{'1 pack s':>12}{f'{VERSIONS} packs s':>12}")
+    for size in SIZES:
+        df = prepare(size)
+        single = timed(lambda: evaluate_rule_packs(df, plans[:1]))
+        several = timed(lambda: evaluate_rule_packs(df, plans))
+        print(f"{size:>10}{single:>12.3f}{several:>12.3f}")
@@ -0,0 +1,60 @@
+"""
+Drives the HTTP eligibility service (app.service) on localhost with concurrent
+clients and prints its latency and throughput metrics.
+
+Run from the repository root:
+    python -m benchmarks.bench_service
+"""
+import json
+import random
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from app.service import EligibilityService, create_server
+from benchmarks.synthetic import generate_tables
+
+N_CHARGES = 200_000
+CLIENTS = 32
+REQUESTS = 2_000
+
+
+def request(base, path, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    with urllib.request.urlopen(urllib.request.Request(base + path, data=data)) as response:
+        return json.loads(response.read())
+
+
+def random_charges(rng):
+    return {"charges": [{
+        "Case Number": f"ADHOC-{rng.randrange(10**6)}",
+        "Case Type": "Criminal",
+        "Statute Code": rng.choice(["27.111", "CR.3.203", "27.349"]),
+        "Charge Description": "SAMPLE CHARGE",
+        "Charge Class": rng.choice(["Misdemeanor", "Felony"]),
+        "Disposition": rng.choice(["DISMISSED", "Guilty"]),
+        "Disposition Date": f"{rng.randrange(1990, 2025)}-06-01",
+    } for _ in range(rng.randrange(1, 5))]}
+
+
+if __name__ == "__main__":
+    parties, cases, charges = generate_tables(N_CHARGES)
+    service = EligibilityService(parties, cases, charges)
+    server = create_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    case_numbers = service.case_data["Case Number"].tolist()
+    party_ids = parties["PartyID"].tolist()
+    rng = random.Random(0)
+    calls = [rng.choice([
+        ("/cases/" + rng.choice(case_numbers), None),
+        (f"/parties/{rng.choice(party_ids)}", None),
+        ("/evaluate", random_charges(rng)),
+    ]) for _ in range(REQUESTS)]
+
+    with ThreadPoolExecutor(CLIENTS) as executor:
+        list(executor.map(lambda call: request(base, *call), calls))
+
+    print(f"{N_CHARGES} charges loaded, {REQUESTS} requests from {CLIENTS} clients")
+    print(json.dumps(request(base, "/metrics"), indent=2))
+    server.shutdown()
@@ -0,0 +1,79 @@
+"""
+Measures cold start costs: importing the pipeline modules in a fresh
+interpreter, and the first (uncached) and second (cached) example data load.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup
+"""
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RUNS = 5
+
+IMPORT_TARGETS = {
+    "pipeline (app.processing)": "import app.processing",
+    "example data loader": "import utils.data_loader",
+    "ui (app.ui)": "import app.ui",
+}
+
+COLD_LOAD = """
+import time
+t0 = time.perf_counter()
+from utils.data_loader import load_example_data
+load_example_data()
+t1 = time.perf_counter()
+load_example_data()
+t2 = time.perf_counter()
+import sys
+print(t1 - t0, t2 - t1, "streamlit" in sys.modules)
+"""
+
+
+def run_python(code):
+    """Runs code in a fresh interpreter from the repository root."""
+    return subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def bench_imports():
+    baseline = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        run_python("pass")
+        baseline.append(time.perf_counter() - start)
+    interpreter = median(baseline)
+
+    print(f"{'import':<30}{'median ms':>12}{'streamlit loaded':>20}")
+    for label, statement in IMPORT_TARGETS.items():
+        timings = []
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            output = run_python(
+                f"{statement}\nimport sys\nprint('streamlit' in sys.modules)")
+            timings.append(time.perf_counter() - start)
+        elapsed = (median(timings) - interpreter) * 1000
+        print(f"{label:<30}{elapsed:>12.1f}{output.strip():>20}")
+
+
+def bench_example_data():
+    first, cached = [], []
+    for _ in range(RUNS):
+        cold, warm, _ = run_python(COLD_LOAD).split()
+        first.append(float(cold))
+        cached.append(float(warm))
+    print(f"\nexample data first load   {median(first) * 1000:>8.1f} ms")
+    print(f"example data cached load  {median(cached) * 1000:>8.3f} ms")
+
+
+if __name__ == "__main__":
+    bench_imports()
+    bench_example_data()
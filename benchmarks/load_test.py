@@ -0,0 +1,342 @@
+"""
+Load test: runs N analyst sessions of the real app.py, up to --concurrency of
+them at once, and reports per-interaction latency percentiles, memory growth
+per session and throughput.
+
+--mode server (the default) starts one `streamlit run app.py` server and
+drives it over its websocket protocol with benchmarks/streamlit_client.py,
+one simulated browser tab per session. All sessions share the server
+process, its result store, caches and locks, so the numbers include their
+contention. Memory is the server's RSS.
+
+--mode apptest runs the sessions headlessly with Streamlit's AppTest instead.
+AppTest installs a process-wide mock runtime for every run, so concurrent
+sessions cannot share one process through its public API: each concurrency
+slot is a worker process that runs its sessions one after another and keeps
+their AppTests alive, like open browser tabs. Nothing is shared between
+workers, so its numbers are per worker process.
+
+Each session follows one flow to a result, then browses it:
+- example: determine eligibility on the bundled example data
+- upload:  uploads generated parties/cases/charges CSVs
+- mysql:   connects to its own database on a local SQLite stand-in for MySQL
+           (benchmarks/standin_mysql.py) seeded with generated data
+- mixed:   sessions rotate through the three flows above
+then opens a case, goes back to the list, pages the ineligible table and
+searches by name.
+
+Run from the repository root:
+    python -m benchmarks.load_test --sessions 8 --concurrency 4 --charges 20000 --flow mixed
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+from streamlit.testing.v1 import AppTest
+from benchmarks import streamlit_client
+from benchmarks.standin_mysql import StandInServer
+from benchmarks.synthetic import generate_tables
+
+ROOT = Path(__file__).resolve().parent.parent
+FLOWS = ["example", "upload", "mysql"]
+MODES = ["server", "apptest"]
+SERVER_PORT = 8765
+TABLES = ["parties", "cases", "charges"]
+SEARCH_QUERY = "SMITH"
+PERCENTILES = [50, 95, 99]
+
+
+def rss_mb():
+    """Current resident set size of this process (an apptest worker), in MB."""
+    return streamlit_client.rss_mb("self")
+
+
+def session_data(flow, index, charges, server):
+    """Generates a session's input: CSV bytes per table (upload), a connection string (mysql) or None."""
+    if flow == "upload":
+        return {table: df.to_csv(index=False).encode()
+                for table, df in zip(TABLES, generate_tables(charges, seed=index))}
+    if flow == "mysql":
+        return server.seed(f"session_{index}", generate_tables(charges, seed=index))
+    return None
+
+
+# --- apptest mode ---
+
+
+def first_case_button(at):
+    return next(b for b in at.button
+                if (b.key or "").removeprefix("ineligible_case_").isdigit())
+
+
+def back_button(at):
+    return next(b for b in at.button if b.label.startswith("🔙"))
+
+
+def next_page(at):
+    buttons = [b for b in at.button if b.key == "ineligible_case_next" and not b.disabled]
+    return buttons[0].click() if buttons else at  # a single page has no pager
+
+
+def upload(table, content):
+    return lambda at: at.file_uploader(key=table).upload(f"{table}.csv", content, "text/csv")
+
+
+def connect(conn_string):
+    def action(at):
+        at.text_input[0].set_value(conn_string)
+        return at.button[0].click()  # the form's "Connect and Load Data" submit button
+    return action
+
+
+BROWSE = [
+    ("open case", lambda at: first_case_button(at).click()),
+    ("back to list", lambda at: back_button(at).click()),
+    ("next page", next_page),
+    ("search", lambda at: at.text_input(key="case_search").input(SEARCH_QUERY)),
+]
+
+
+def prepare_session(flow, data):
+    """Returns an apptest session's list of (interaction, action)."""
+    steps = [("first load", lambda at: at)]
+    if flow == "upload":
+        steps.append(("choose upload",
+                      lambda at: at.radio(key="data_source").set_value("Upload your own data")))
+        for table, content in data.items():
+            steps.append((f"upload {table}", upload(table, content)))
+    elif flow == "mysql":
+        steps.append(("choose MySQL",
+                      lambda at: at.radio(key="data_source").set_value("Load from MySQL")))
+        steps.append(("connect", connect(data)))
+    steps.append(("determine eligibility",
+                  lambda at: at.button(key="determine_eligibility").click()))
+    return steps + BROWSE
+
+
+def run_session(steps, timeout):
+    """
+    Runs one session's interactions in order, stopping at the first failure.
+    Returns (AppTest, [(interaction, seconds, error or None)]).
+    """
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=timeout)
+    timings = []
+    for name, action in steps:
+        start = time.perf_counter()
+        try:
+            action(at).run()
+            errors = [e.value for e in at.exception] + [e.value for e in at.error]
+            error = "; ".join(map(str, errors)) or None
+        except Exception as e:
+            error = repr(e)
+        timings.append((name, time.perf_counter() - start, error))
+        if error:
+            break
+    return at, timings
+
+
+# Per worker process: its settings, the stand-in server and its sessions' AppTests
+worker = {}
+
+
+def start_worker(work_dir, charges, timeout):
+    """
+    Worker initializer: points app.db at the stand-in server and warms up
+    imports and caches, so RSS growth reflects per-session state only.
+    """
+    server = StandInServer(work_dir)
+    server.install()
+    worker.update(server=server, charges=charges, timeout=timeout, open_sessions=[])
+    run_session(prepare_session("example", None), timeout)
+
+
+def run_worker_session(flow, index):
+    """
+    Prepares and runs one session in a worker process. Returns (timings,
+    RSS growth in MB, start, end) with monotonic start/end times.
+    """
+    steps = prepare_session(flow, session_data(flow, index, worker["charges"], worker["server"]))
+    rss_before = rss_mb()
+    start = time.monotonic()
+    at, timings = run_session(steps, worker["timeout"])
+    end = time.monotonic()
+    worker["open_sessions"].append(at)
+    return timings, rss_mb() - rss_before, start, end
+
+
+def run_apptest(sessions, args, work_dir):
+    with ProcessPoolExecutor(
+            max_workers=args.concurrency, mp_context=multiprocessing.get_context("spawn"),
+            initializer=start_worker,
+            initargs=(work_dir, args.charges, args.timeout)) as executor:
+        results = list(executor.map(run_worker_session, *zip(*sessions)))
+    report(results, len(sessions))
+    growth = [rss for _, rss, _, _ in results]
+    print(f"RSS:          {np.mean(growth):.1f} MB per session "
+          f"(max {max(growth):.1f} MB, {sum(growth):.0f} MB in total)")
+    print(f"\nSessions ran in {min(args.concurrency, len(sessions))} separate worker processes "
+          "that share no result store, caches or locks: latency and RSS are per worker "
+          "and include no contention between workers. Use --mode server for a shared server.")
+
+
+# --- server mode ---
+
+
+async def next_page_button(tab):
+    buttons = [w for w in tab.widgets.values()
+               if w.key == "ineligible_case_next" and not w.proto.disabled]
+    if buttons:  # a single page has no pager
+        await tab.click(buttons[0])
+
+
+async def connect_tab(tab, conn_string):
+    await tab.submit_form(
+        {tab.widget(label_prefix="MySQL Connection String"): {"string_value": conn_string}},
+        tab.widget(label_prefix="Connect and Load Data"))
+
+
+SERVER_BROWSE = [
+    ("open case", lambda tab: tab.click(tab.widget(key=next(
+        key for key in tab.widget_keys() if key.removeprefix("ineligible_case_").isdigit())))),
+    ("back to list", lambda tab: tab.click(tab.widget(label_prefix="🔙"))),
+    ("next page", next_page_button),
+    ("search", lambda tab: tab.set_value(tab.widget(key="case_search"), string_value=SEARCH_QUERY)),
+]
+
+
+def prepare_tab(flow, data):
+    """Returns a server session's list of (interaction, async action on a BrowserSession)."""
+    steps = [("first load", lambda tab: tab.open())]
+    if flow == "upload":
+        steps.append(("choose upload", lambda tab: tab.set_value(
+            tab.widget(key="data_source"), string_value="Upload your own data")))
+        for table, content in data.items():
+            steps.append((f"upload {table}", lambda tab, table=table, content=content: tab.upload(
+                tab.widget(key=table), f"{table}.csv", content)))
+    elif flow == "mysql":
+        steps.append(("choose MySQL", lambda tab: tab.set_value(
+            tab.widget(key="data_source"), string_value="Load from MySQL")))
+        steps.append(("connect", lambda tab: connect_tab(tab, data)))
+    steps.append(("determine eligibility",
+                  lambda tab: tab.click(tab.widget(key="determine_eligibility"))))
+    return steps + SERVER_BROWSE
+
+
+async def run_tab(tab, steps, timeout):
+    """Like run_session, for one browser tab on the server. Returns (timings, start, end)."""
+    timings = []
+    start = time.monotonic()
+    for name, action in steps:
+        step_start = time.perf_counter()
+        try:
+            await asyncio.wait_for(action(tab), timeout)
+            error = "; ".join(map(str, tab.errors)) or None
+        except Exception as e:
+            error = repr(e)
+        timings.append((name, time.perf_counter() - step_start, error))
+        if error:
+            break
+    return timings, start, time.monotonic()
+
+
+async def run_tabs(all_steps, concurrency, port, timeout):
+    """Runs the sessions' tabs, up to concurrency at once, keeping finished tabs open until all are done."""
+    slots = asyncio.Semaphore(concurrency)
+    tabs = [streamlit_client.BrowserSession(port) for _ in all_steps]
+
+    async def run_one(tab, steps):
+        async with slots:
+            return await run_tab(tab, steps, timeout)
+    try:
+        return await asyncio.gather(*(run_one(tab, steps) for tab, steps in zip(tabs, all_steps)))
+    finally:
+        await asyncio.gather(*(tab.close() for tab in tabs))
+
+
+def run_server(sessions, args, work_dir):
+    server = StandInServer(work_dir)
+    server.install()  # for seeding; the server process installs its own
+    all_steps = [prepare_tab(flow, session_data(flow, index, args.charges, server))
+                 for flow, index in sessions]
+
+    process = streamlit_client.start_server(work_dir, args.port)
+    try:
+        # Warm up imports and caches, so RSS growth reflects per-session state only
+        asyncio.run(run_tabs([prepare_tab("example", None)], 1, args.port, args.timeout))
+        rss_before = streamlit_client.rss_mb(process.pid)
+        results = asyncio.run(run_tabs(all_steps, args.concurrency, args.port, args.timeout))
+        rss_after = streamlit_client.rss_mb(process.pid)
+    finally:
+        process.terminate()
+        process.wait()
+
+    report([(timings, None, start, end) for timings, start, end in results], len(sessions))
+    print(f"server RSS:   {rss_before:.0f} MB after warm-up, {rss_after:.0f} MB with all "
+          f"sessions open ({(rss_after - rss_before) / len(sessions):.1f} MB per session)")
+
+
+def report(results, sessions):
+    """Prints latency percentiles per interaction, failures and throughput for (timings, _, start, end) results."""
+    by_name = {}
+    failures = []
+    for timings, _, _, _ in results:
+        for name, seconds, error in timings:
+            by_name.setdefault(name, []).append(seconds * 1000)
+            if error:
+                failures.append((name, error))
+
+    print(f"\n{'interaction':<24}{'count':>7}" + "".join(f"{f'p{p}':>11}" for p in PERCENTILES))
+    for name, values in by_name.items():
+        print(f"{name:<24}{len(values):>7}" + "".join(
+            f"{np.percentile(values, p):>8.0f} ms" for p in PERCENTILES))
+
+    wall = max(end for *_, end in results) - min(start for *_, start, _ in results)
+    interactions = sum(len(values) for values in by_name.values())
+    print(f"\n{sessions} sessions, {interactions} interactions, {len(failures)} failed")
+    for name, error in failures:
+        print(f"  {name}: {error[:200]}")
+    print(f"wall time:    {wall:.1f} s")
+    print(f"throughput:   {interactions / wall:.2f} interactions/s, "
+          f"{sessions / wall:.2f} sessions/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mode", choices=MODES, default="server")
+    parser.add_argument("--sessions", type=int, default=8, help="simulated sessions")
+    parser.add_argument("--concurrency", type=int, default=4, help="sessions running at once")
+    parser.add_argument("--charges", type=int, default=20_000,
+                        help="charges in each upload/mysql session's generated data")
+    parser.add_argument("--flow", choices=FLOWS + ["mixed"], default="mixed")
+    parser.add_argument("--timeout", type=float, default=600, help="per-interaction timeout (s)")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="server mode's port")
+    args = parser.parse_args()
+
+    flows = FLOWS if args.flow == "mixed" else [args.flow]
+    sessions = [(flows[i % len(flows)], i) for i in range(args.sessions)]
+
+    work_dir = tempfile.mkdtemp(prefix="eligibility-load-test-")
+    # Keep this run's history and stored results out of the working tree;
+    # the workers and the server inherit these before they import the app
+    os.environ.setdefault("RUN_HISTORY_DB", os.path.join(work_dir, "run_history.sqlite"))
+    os.environ.setdefault("RESULT_STORE_DIR", os.path.join(work_dir, "results"))
+    try:
+        if args.mode == "server":
+            run_server(sessions, args, work_dir)
+        else:
+            run_apptest(sessions, args, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    # AppTest replaces __main__ with app.py while it runs, so worker tasks
+    # must refer to this module by its import name
+    from benchmarks.load_test import main
+    main()
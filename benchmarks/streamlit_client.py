@@ -0,0 +1,231 @@
+"""
+A minimal browser stand-in for load tests against a real `streamlit run`
+server: it speaks the frontend's websocket protocol (BackMsg/ForwardMsg
+protobufs on /_stcore/stream) and its file upload endpoint, renders nothing,
+and keeps track of the widgets each script run sends so they can be clicked,
+set and uploaded to the way the frontend does it.
+
+start_server runs app.py in a server process with app.db pointed at the
+local MySQL stand-in (benchmarks/standin_mysql.py), so every session shares
+the one process, its result store and its locks, as they do in production.
+"""
+import asyncio
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+from pathlib import Path
+import websockets
+from streamlit.proto.Alert_pb2 import Alert
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+ROOT = Path(__file__).resolve().parent.parent
+SERVER_START_TIMEOUT = 60
+
+
+def serve(work_dir, port):
+    """Server process entry point: installs the MySQL stand-in, then runs `streamlit run app.py`."""
+    from streamlit.web.cli import main as streamlit_main
+    from benchmarks.standin_mysql import StandInServer
+    StandInServer(work_dir).install()
+    sys.argv = [
+        "streamlit", "run", str(ROOT / "app.py"),
+        "--server.headless=true", f"--server.port={port}", "--server.address=127.0.0.1",
+        # Uploads come from this client, which has no XSRF cookie
+        "--server.enableXsrfProtection=false",
+        "--server.fileWatcherType=none", "--browser.gatherUsageStats=false",
+    ]
+    streamlit_main()
+
+
+def start_server(work_dir, port):
+    """Starts a server process (see serve) and waits until it is healthy; returns the Popen."""
+    process = subprocess.Popen(
+        [sys.executable, "-c",
+         f"from benchmarks.streamlit_client import serve; serve({str(work_dir)!r}, {port})"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Streamlit server exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"Streamlit server did not start within {SERVER_START_TIMEOUT} s")
+
+
+def rss_mb(pid):
+    """Current resident set size of a process, in MB."""
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+class Widget:
+    """A widget from the last run: its element type, proto and the fragment it was drawn in."""
+
+    def __init__(self, kind, proto, fragment_id):
+        self.kind = kind
+        self.proto = proto
+        self.fragment_id = fragment_id
+
+    @property
+    def id(self):
+        return self.proto.id
+
+    @property
+    def key(self):
+        """The user key ("$$ID-<hash>-<key>"), or None for keyless widgets."""
+        key = self.id.rsplit("-", 1)[-1]
+        return None if key == "None" else key
+
+    @property
+    def label(self):
+        return self.proto.label
+
+
+class BrowserSession:
+    """
+    One browser tab. Each interaction sends a rerun with the widget values set
+    so far (plus a button trigger for clicks) and waits for the run to finish.
+    Interactions inside an st.fragment rerun only that fragment, like the
+    frontend does. Errors the run shows (exceptions and st.error) are
+    collected per run in errors.
+    """
+
+    def __init__(self, port):
+        self.base_url = f"http://127.0.0.1:{port}"
+        self.ws_url = f"ws://127.0.0.1:{port}/_stcore/stream"
+        self.ws = None
+        self.session_id = None
+        self.states = {}
+        self.widgets = {}
+        self.errors = []
+
+    async def open(self):
+        """Connects and runs the page for the first time."""
+        self.ws = await websockets.connect(
+            self.ws_url, subprotocols=["streamlit"], max_size=None, ping_interval=None)
+        await self.rerun()
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    def widget(self, key=None, label_prefix=None):
+        """The first widget of the last run with this key or label prefix."""
+        for _, widget in sorted(self.widgets.items()):
+            if key is not None and widget.key == key:
+                return widget
+            if label_prefix is not None and widget.label.startswith(label_prefix):
+                return widget
+        raise LookupError(f"No widget with key {key!r} or label {label_prefix!r}")
+
+    def widget_keys(self):
+        return [widget.key for _, widget in sorted(self.widgets.items()) if widget.key]
+
+    async def click(self, widget):
+        trigger = WidgetState(id=widget.id, trigger_value=True)
+        await self.rerun(extra=[trigger], fragment_id=widget.fragment_id)
+
+    async def set_value(self, widget, **value):
+        """Sets a widget's value (a WidgetState field, e.g. string_value="x") and reruns."""
+        self.states[widget.id] = WidgetState(id=widget.id, **value)
+        await self.rerun(fragment_id=widget.fragment_id)
+
+    async def submit_form(self, values, submit_button):
+        """Sets the form's widget values ({widget: {field: value}}) and clicks its submit button."""
+        for widget, value in values.items():
+            self.states[widget.id] = WidgetState(id=widget.id, **value)
+        await self.click(submit_button)
+
+    async def upload(self, widget, name, content):
+        """Uploads a file through the upload endpoint, then sets the file_uploader's value."""
+        request = BackMsg()
+        request.file_urls_request.request_id = uuid.uuid4().hex
+        request.file_urls_request.file_names.append(name)
+        request.file_urls_request.session_id = self.session_id
+        await self.ws.send(request.SerializeToString())
+        response = await self._receive(
+            lambda msg: msg.WhichOneof("type") == "file_urls_response"
+            and msg.file_urls_response.response_id == request.file_urls_request.request_id)
+        urls = response.file_urls_response.file_urls[0]
+        await asyncio.to_thread(self._put_file, urls.upload_url, name, content)
+
+        state = WidgetState(id=widget.id)
+        info = state.file_uploader_state_value.uploaded_file_info.add()
+        info.file_id, info.name, info.size = urls.file_id, name, len(content)
+        info.file_urls.CopyFrom(urls)
+        self.states[widget.id] = state
+        await self.rerun(fragment_id=widget.fragment_id)
+
+    def _put_file(self, upload_url, name, content):
+        boundary = uuid.uuid4().hex
+        body = (
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; "
+            f"filename=\"{name}\"\r\nContent-Type: text/csv\r\n\r\n"
+        ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+        url = upload_url if upload_url.startswith("http") else self.base_url + upload_url
+        request = urllib.request.Request(
+            url, data=body, method="PUT",
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"})
+        with urllib.request.urlopen(request):
+            pass
+
+    async def rerun(self, extra=(), fragment_id=""):
+        """Sends a rerun and applies the run's elements until it finishes; returns the run's errors."""
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = ""
+        msg.rerun_script.widget_states.widgets.extend(list(self.states.values()) + list(extra))
+        if fragment_id:
+            msg.rerun_script.fragment_id = fragment_id
+        await self.ws.send(msg.SerializeToString())
+
+        widgets, errors = {}, []
+        while True:
+            forward = await self._receive(lambda msg: True)
+            kind = forward.WhichOneof("type")
+            if kind == "new_session":
+                self.session_id = forward.new_session.initialize.session_id
+            elif kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                element_type = element.WhichOneof("type")
+                proto = getattr(element, element_type)
+                path = tuple(forward.metadata.delta_path)
+                if element_type == "exception":
+                    errors.append(proto.message)
+                elif element_type == "alert" and proto.format == Alert.ERROR:
+                    errors.append(proto.body)
+                elif hasattr(proto, "id") and proto.id:
+                    widgets[path] = Widget(element_type, proto, forward.delta.fragment_id)
+            elif kind == "script_finished":
+                if forward.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    widgets, errors = {}, []  # the server reruns on its own (st.rerun)
+                    continue
+                break
+
+        if fragment_id:
+            # A fragment run redraws only that fragment's elements
+            self.widgets = {path: widget for path, widget in self.widgets.items()
+                            if widget.fragment_id != fragment_id}
+            self.widgets.update(widgets)
+        else:
+            self.widgets = widgets
+        self.errors = errors
+        return errors
+
+    async def _receive(self, accept):
+        """Returns the next ForwardMsg accepted by accept, skipping others."""
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await self.ws.recv())
+            if accept(msg):
+                return msg
@@ -0,0 +1,81 @@
+"""
+Generates synthetic parties/cases/charges tables with the same columns as the
+example data, at any size, for benchmarks and load tests.
+"""
+import numpy as np
+import pandas as pd
+
+FIRST_NAMES = ["JAMES", "MARIA", "JUSTIN", "ALEX", "JESSICA", "JOE", "JACK", "ANA"]
+LAST_NAMES = ["SMITH", "LOPEZ", "TAYLOR", "YONKER", "SIMMONS", "HARVARD", "JONES", "KIM"]
+CASE_TYPES = ["Criminal - SOC - Application", "Criminal Indictment", "Domestic Violence"]
+COURT_SYSTEMS = ["District Court", "Circuit Court"]
+LOCATIONS = ["Wabash Ave", "Baltimore City Circuit Court", "Annapolis", "Towson"]
+AGENCIES = ["QUEEN ANNE'S COUNTY SHERIFF'S DEPT", "BALTIMORE CITY POLICE", "MD STATE POLICE"]
+STATUTES = ["27.111", "27.349", "CR.3.203", "27.342", "CL", "CR.6-105"]
+DESCRIPTIONS = ["MAL. DESTR. PROP", "U/U LIVESTOCK MV ETC", "ASSAULT 2", "ASSAULT 2",
+                "OBSTRUCTING & HINDERING", "BURGLARY"]
+CLASSES = ["Misdemeanor", "Misdemeanor", "Felony"]
+DISPOSITIONS = ["Probation After Conviction - Guilty", "Probation Before Judgment",
+                "DISMISSED", "NOLLE PROSEQUI", "STET", "Guilty"]
+
+
+def _dates(rng, n, start="1985-01-01", end="2025-12-31", missing=0.0):
+    start, end = pd.Timestamp(start).value // 10**9, pd.Timestamp(end).value // 10**9
+    dates = pd.to_datetime(rng.integers(start, end, n), unit="s").strftime("%m/%d/%Y")
+    dates = pd.Series(dates, dtype=object)
+    if missing:
+        dates[rng.random(n) < missing] = None
+    return dates
+
+
+def generate_tables(n_charges, charges_per_case=2, cases_per_party=2, seed=0):
+    """Returns (parties, cases, charges) DataFrames shaped like the example CSVs."""
+    rng = np.random.default_rng(seed)
+    n_cases = max(1, n_charges // charges_per_case)
+    n_parties = max(1, n_cases // cases_per_party)
+
+    first = rng.choice(FIRST_NAMES, n_parties)
+    last = rng.choice(LAST_NAMES, n_parties)
+    parties = pd.DataFrame({
+        "PartyID": np.arange(1, n_parties + 1),
+        "Name": pd.Series(last, dtype=object) + ", " + first,
+        "Race": rng.choice(["White", "Black", "Other"], n_parties),
+        "Sex": rng.choice(["Male", "Female"], n_parties),
+        "DOB": _dates(rng, n_parties, "1950-01-01", "2005-12-31"),
+        "Address": "1 MAIN ST",
+        "City": "BALTIMORE",
+        "State": "MD",
+        "Zip Code": "21215",
+        "Aliases": None,
+    })
+
+    cases = pd.DataFrame({
+        "CaseID": np.arange(1, n_cases + 1),
+        "PartyID": rng.integers(1, n_parties + 1, n_cases),
+        "Case Title": "STATE OF MARYLAND VS DOE",
+        "Case Number": (rng.permutation(n_cases) + 10_000_000).astype(str),
+        "Court System": rng.choice(COURT_SYSTEMS, n_cases),
+        "Location": rng.choice(LOCATIONS, n_cases),
+        "Case Type": rng.choice(CASE_TYPES, n_cases, p=[0.7, 0.2, 0.1]),
+        "Filing Date": _dates(rng, n_cases),
+        "Case Status": "Closed",
+        "Judicial Officer": "Joe, Joe",
+    })
+
+    statute = rng.integers(0, len(STATUTES), n_charges)
+    charges = pd.DataFrame({
+        "ChargeID": np.arange(1, n_charges + 1),
+        "CaseID": rng.integers(1, n_cases + 1, n_charges),
+        "Charge No": rng.integers(1, 5, n_charges),
+        "CJIS Code": "1-0431",
+        "Statute Code": np.array(STATUTES)[statute],
+        "Charge Description": np.array(DESCRIPTIONS)[statute],
+        "Charge Class": rng.choice(CLASSES, n_charges),
+        "Offense Date": _dates(rng, n_charges),
+        "Agency Name": rng.choice(AGENCIES, n_charges),
+        "Plea": "Guilty",
+        "Plea Date": _dates(rng, n_charges),
+        "Disposition": rng.choice(DISPOSITIONS, n_charges),
+        "Disposition Date": _dates(rng, n_charges, missing=0.02),
+    })
+    return parties, cases, charges
@@ -0,0 +1,100 @@
+from contextlib import closing
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from app.backends import get_backend
+from app.processing import process_case_data
+from utils.data_loader import DATA_DIR
+
+TABLES = ["parties", "cases", "charges"]
+BACKENDS = ["pandas", "duckdb", "polars"]
+
+
+def edit_csv(path, edits):
+    """Rewrites a CSV with cell edits ({(row, column): text}) applied, keeping every value as text."""
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    for (row, col), value in edits.items():
+        df.loc[row, col] = value
+    df.to_csv(path, index=False)
+
+
+@pytest.fixture(scope="module")
+def example_dir():
+    return DATA_DIR
+
+
+@pytest.fixture(scope="module")
+def edge_case_dir(tmp_path_factory):
+    """The example data with unreadable, padded, missing and unmatched values."""
+    directory = tmp_path_factory.mktemp("edge_cases")
+    for table in TABLES:
+        df = pd.read_csv(DATA_DIR / f"{table}.csv", dtype=str, keep_default_na=False)
+        df.columns = [f" {col} " if col == "Name" else col for col in df.columns]
+        df.to_csv(directory / f"{table}.csv", index=False)
+    edit_csv(directory / "parties.csv", {
+        (0, " Name "): "  LOPEZ, JUSTIN  ",
+        (1, "State"): " md ",
+        (2, "DOB"): "13/45/1990",
+        (3, "Aliases"): "NULL",
+    })
+    edit_csv(directory / "cases.csv", {
+        (0, "Filing Date"): " 08/14/2017 ",
+        (1, "Case Type"): "",
+        (2, "PartyID"): "999",
+    })
+    edit_csv(directory / "charges.csv", {
+        (0, "ChargeID"): "1.5",
+        (1, "Disposition Date"): "  08/30/2017",
+        (2, "Disposition Date"): "not a date",
+        (3, "CaseID"): "",
+        (4, "CaseID"): "12345",
+        (5, "Probation (Years)"): "x",
+        (6, "Disposition"): "",
+        (7, "Disposition Date"): "08/30/24",
+        (8, "Offense Date"): "8/1/2017",
+    })
+    return directory
+
+
+def paths(directory):
+    return [directory / f"{table}.csv" for table in TABLES]
+
+
+def frames(directory):
+    return [pd.read_csv(path) for path in paths(directory)]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    if request.param != "pandas":
+        pytest.importorskip(request.param)
+        pytest.importorskip("pyarrow")
+    return request.param
+
+
+@pytest.mark.parametrize("data_dir", ["example_dir", "edge_case_dir"])
+@pytest.mark.parametrize("read", [paths, frames], ids=["paths", "frames"])
+def test_backend_matches_pandas(backend, data_dir, read, request):
+    directory = request.getfixturevalue(data_dir)
+    expected = process_case_data(*read(directory), show_errors=False, backend="pandas")
+    actual = process_case_data(*read(directory), show_errors=False, backend=backend)
+    assert not expected[1].empty
+    assert_frame_equal(actual[0], expected[0])
+    assert_frame_equal(actual[1], expected[1])
+
+
+def test_backend_reports_pandas_bad_values(backend, edge_case_dir):
+    for path in paths(edge_case_dir):
+        table = path.stem
+        with closing(get_backend("pandas")) as engine:
+            expected = engine.prepare(path, table)[1:]
+        with closing(get_backend(backend)) as engine:
+            actual = engine.prepare(path, table)[1:]
+        assert actual == expected
+
+
+def test_paths_and_frames_give_the_same_columns(backend, edge_case_dir):
+    from_paths = process_case_data(*paths(edge_case_dir), show_errors=False, backend=backend)
+    from_frames = process_case_data(*frames(edge_case_dir), show_errors=False, backend=backend)
+    assert list(from_paths[1].columns) == list(from_frames[1].columns)
+    assert {"Jail Term (Years)", "Probation (Years)"} <= set(from_paths[1].columns)
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.entity_resolution import (MAX_BLOCK_SIZE, _connected_components, normalize_name,
+                                     resolve_parties)
+
+PARTY = {"Name": "SMITH, JAMES", "Sex": "M", "DOB": "1980-01-01", "Aliases": None}
+
+
+def parties(*rows):
+    """A parties frame with PartyIDs 1, 2, ..., each row being PARTY with the given changes."""
+    df = pd.DataFrame([{"PartyID": i, **PARTY, **row} for i, row in enumerate(rows, 1)])
+    df["PartyID"] = df["PartyID"].astype("Int64")
+    df["DOB"] = pd.to_datetime(df["DOB"])
+    return df
+
+
+def person_ids(*rows):
+    return resolve_parties(parties(*rows))["PersonID"].tolist()
+
+
+@pytest.mark.parametrize("name", ["SMITH, JAMES A Jr.", "James Smith", "smith james iii"])
+def test_normalize_name(name):
+    assert normalize_name(name) == "JAMES SMITH"
+
+
+def test_normalize_name_without_letters():
+    assert normalize_name("J.") is None
+    assert normalize_name(None) is None
+
+
+def test_connected_components_label_with_smallest_id():
+    labels = _connected_components(
+        np.array([10, 3, 7, 5, 8]), np.array([10, 7, 5]), np.array([7, 5, 3]))
+    # 10-7-5-3 is one chain; 8 has no edges
+    assert labels.tolist() == [3, 3, 3, 3, 8]
+
+
+def test_same_name_and_dob_are_linked():
+    assert person_ids({}, {"Name": "James Smith"}, {"Name": "SMITH, JOHN"}) == [1, 1, 3]
+
+
+def test_different_dob_is_not_linked():
+    assert person_ids({}, {"DOB": "1980-01-02"}) == [1, 2]
+
+
+def test_alias_links_parties():
+    assert person_ids(
+        {"Name": "JONES, JIM", "Aliases": "J. DOE; SMITH, JAMES"}, {}) == [1, 1]
+
+
+def test_links_are_transitive():
+    # 1 and 3 only meet through 2's alias
+    assert person_ids(
+        {"Name": "JONES, JIM"},
+        {"Aliases": "JONES, JIM"},
+        {},
+    ) == [1, 1, 1]
+
+
+def test_sex_conflict_is_not_linked():
+    assert person_ids({}, {"Sex": "F"}, {"Sex": "m"}) == [1, 2, 1]
+
+
+def test_unknown_sex_is_not_a_conflict():
+    assert person_ids({}, {"Sex": None}) == [1, 1]
+
+
+def test_missing_dob_is_not_linked():
+    assert person_ids({"DOB": None}, {"DOB": None}) == [1, 2]
+
+
+def test_oversized_blocks_are_left_unresolved():
+    ids = person_ids(*[{} for _ in range(MAX_BLOCK_SIZE + 1)])
+    assert ids == list(range(1, MAX_BLOCK_SIZE + 2))
+
+
+def test_person_id_keeps_party_id_dtype():
+    assert resolve_parties(parties({}, {}))["PersonID"].dtype == "Int64"
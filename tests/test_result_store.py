@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from app.processing import determine_eligibility, process_case_data
+from app.result_store import ResultStore
+from utils.cube import CUBE_DIMENSIONS, build_cube, update_cube
+from utils.data_loader import load_example_data
+
+KEYS = CUBE_DIMENSIONS + ["Status"]
+
+
+@pytest.fixture(scope="module")
+def processed():
+    return process_case_data(*load_example_data().values(), show_errors=False)
+
+
+def evaluated_on(processed, today):
+    """The example result as it would have been evaluated on an earlier or later date."""
+    case_data, charges = processed
+    charges = determine_eligibility(charges.copy(), today=today)
+    eligibility = charges.drop_duplicates("Case Number").set_index("Case Number")["Eligibility"]
+    return case_data.assign(Eligibility=case_data["Case Number"].map(eligibility)), charges
+
+
+@pytest.fixture(scope="module")
+def past(processed):
+    """A date on which part of the example data is still waiting."""
+    charges = processed[1]
+    dates = charges.loc[charges["Eligibility"].str.startswith("✅"), "Eligibility Date"]
+    return dates.sort_values().iloc[len(dates) // 2].normalize()
+
+
+def sorted_cube(cube):
+    return cube.sort_values(KEYS).reset_index(drop=True)
+
+
+def test_update_cube_matches_rebuilt_cube(processed, past):
+    _, before = evaluated_on(processed, past)
+    _, after = evaluated_on(processed, past + pd.DateOffset(years=5))
+    changed = before.loc[before["Eligibility"] != after["Eligibility"], "Case Number"].unique()
+    assert len(changed)
+
+    old = before[before["Case Number"].isin(changed)]
+    new = after[after["Case Number"].isin(changed)]
+    assert_frame_equal(sorted_cube(update_cube(build_cube(before), old, new)),
+                       sorted_cube(build_cube(after)))
+
+
+def test_refresh_applies_cases_that_became_eligible(processed, past, tmp_path):
+    store = ResultStore(tmp_path)
+    key = store.put(*evaluated_on(processed, past))
+    assert store.refresh(key, today=past) == 0
+
+    later = past + pd.DateOffset(years=5)
+    expected_cases, expected_charges = evaluated_on(processed, later)
+    assert store.refresh(key, today=later) > 0
+    assert store.refresh(key, today=later) == 0
+
+    eligible = expected_cases["Eligibility"].str.startswith("✅")
+    assert store.summary(key) == {
+        "total": len(expected_cases), "eligible": int(eligible.sum()),
+        "as_of": later.date().isoformat()}
+    assert store.count_cases(key, eligible=True) == eligible.sum()
+    assert_frame_equal(sorted_cube(store.cube(key)), sorted_cube(build_cube(expected_charges)))
+
+    case_number = expected_cases.loc[eligible, "Case Number"].iloc[-1]
+    expected = expected_cases.set_index("Case Number").loc[case_number, "Eligibility"]
+    assert store.read_case(key, case_number)["Eligibility"].tolist() == [expected]
+    assert store.search(key, case_number)["Eligibility"].iloc[0] == expected
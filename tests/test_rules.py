@@ -0,0 +1,159 @@
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from utils.constants import MARYLAND_RULE_PACK
+from utils.rules import (NO_DISPOSITION_DATE, compile_rule_pack, evaluate_rule_packs,
+                         get_plan)
+
+TODAY = "2025-01-01"
+CHARGE = {
+    "Case Number": "C-1",
+    "PersonID": 1,
+    "Case Type": "CRIMINAL",
+    "Statute Code": "27.111",
+    "Charge Description": "SAMPLE CHARGE",
+    "Charge Class": "MISDEMEANOR",
+    "Disposition": "GUILTY",
+    "Disposition Date": "2001-06-01",
+}
+
+
+def charges(*rows):
+    """A charge-level frame, each row being CHARGE with the given changes."""
+    df = pd.DataFrame([{**CHARGE, **row} for row in rows])
+    df["Disposition Date"] = pd.to_datetime(df["Disposition Date"])
+    return df
+
+
+def pack(**changes):
+    return {**MARYLAND_RULE_PACK, "name": "Test", **changes}
+
+
+def evaluate(df, plan=None):
+    plan = plan or get_plan()
+    return evaluate_rule_packs(df, [plan], today=TODAY)[plan["key"]]
+
+
+def test_messages():
+    result = evaluate(charges(
+        {"Case Number": "EXCLUDED", "Statute Code": "27.342", "Charge Description": "ASSAULT 2"},
+        {"Case Number": "EXCLUDED", "Statute Code": "CR.3.203", "Charge Description": "ASSAULT"},
+        {"Case Number": "DV", "Case Type": "DOMESTIC VIOLENCE"},
+        {"Case Number": "FELONY", "Charge Class": "FELONY"},
+        {"Case Number": "DISMISSED", "Disposition": "DISMISSED"},
+        {"Case Number": "OLD"},
+        {"Case Number": "RECENT", "Disposition Date": "2020-03-01"},
+        {"Case Number": "RECENT DISMISSED", "Disposition": "NOLLE PROSEQUI",
+         "Disposition Date": "2023-03-01"},
+    ))
+    assert result["Eligibility"].to_dict() == {
+        "EXCLUDED": "❌ Not Eligible - Excluded Misdemeanor(s): "
+                    "ASSAULT 2 (27.342); ASSAULT (CR.3.203)",
+        "DV": "❌ Not Eligible - Domestic Violence Case",
+        "FELONY": "❌ Not Eligible - Felony",
+        "DISMISSED": "✅ Eligible - Non-Conviction",
+        "OLD": "✅ Eligible",
+        "RECENT": "⏳ Wait until 2027-02-28",
+        "RECENT DISMISSED": "⏳ Wait until 2026-02-28 (Non-Conviction)",
+    }
+    assert result.loc["RECENT", "Eligibility Date"] == pd.Timestamp("2027-02-28")
+    assert pd.isna(result.loc["FELONY", "Eligibility Date"])
+
+
+def test_first_exclusion_decides():
+    result = evaluate(charges(
+        {"Statute Code": "27.342", "Case Type": "DOMESTIC VIOLENCE", "Charge Class": "FELONY"}))
+    assert result.loc["C-1", "Eligibility"].startswith("❌ Not Eligible - Excluded Misdemeanor(s)")
+
+
+def test_no_disposition_date_takes_precedence():
+    result = evaluate(charges(
+        {"Case Number": "NONE", "Statute Code": "27.342", "Disposition Date": None},
+        {"Case Number": "SOME", "Disposition Date": None},
+        {"Case Number": "SOME"},
+    ))
+    assert result.loc["NONE", "Eligibility"] == NO_DISPOSITION_DATE
+    assert pd.isna(result.loc["NONE", "Most Relevant Disposition Date"])
+    # A case with at least one dated charge is evaluated on its dated charges
+    assert result.loc["SOME", "Eligibility"] == "✅ Eligible"
+
+
+def test_latest_eligibility_date_decides():
+    result = evaluate(charges(
+        {"Disposition": "DISMISSED", "Disposition Date": "2017-01-01"},
+        {"Disposition Date": "2015-01-01"},
+    ))
+    # 2015 + 7 years is later than 2017 + 3 years
+    assert result.loc["C-1", "Eligibility"] == "✅ Eligible"
+    assert result.loc["C-1", "Eligibility Date"] == pd.Timestamp("2021-12-30")
+    assert result.loc["C-1", "Most Relevant Disposition Date"] == pd.Timestamp("2015-01-01")
+
+
+@pytest.mark.parametrize("tie_break, label", [("row_order", "Second"), ("class_order", "First")])
+def test_tie_break(tie_break, label):
+    plan = compile_rule_pack(pack(tie_break=tie_break, waiting_periods=[
+        {"label": "First", "match": {"Disposition": {"equals": "DISMISSED"}}, "days": 365},
+        {"label": "Second", "match": {}, "days": 365},
+    ]))
+    # Both charges become eligible on the same date; the second period's charge comes first
+    result = evaluate(charges({}, {"Disposition": "DISMISSED"}), plan)
+    assert result.loc["C-1", "Eligibility"] == f"✅ Eligible - {label}"
+
+
+def test_blockers_disqualify_every_case_of_the_person():
+    plan = compile_rule_pack(pack(blockers=[
+        {"reason": "Open Case", "match": {"Disposition": {"equals": "PENDING"}}},
+    ]))
+    result = evaluate(charges(
+        {"Case Number": "BLOCKING", "Disposition": "PENDING"},
+        {"Case Number": "SAME PERSON"},
+        {"Case Number": "EXCLUDED", "Statute Code": "27.342"},
+        {"Case Number": "OTHER PERSON", "PersonID": 2},
+    ), plan)
+    assert result["Eligibility"].to_dict() == {
+        "BLOCKING": "❌ Not Eligible - Open Case",
+        "SAME PERSON": "❌ Not Eligible - Open Case",
+        # Exclusions come first
+        "EXCLUDED": "❌ Not Eligible - Excluded Misdemeanor(s): SAMPLE CHARGE (27.342)",
+        "OTHER PERSON": "✅ Eligible",
+    }
+
+
+def test_blockers_need_a_person_column():
+    plan = compile_rule_pack(pack(blockers=[
+        {"reason": "Open Case", "match": {"Disposition": {"equals": "PENDING"}}},
+    ]))
+    with pytest.raises(ValueError, match="PersonID or PartyID"):
+        evaluate(charges({}).drop(columns="PersonID"), plan)
+
+
+def test_several_packs_are_evaluated_like_one():
+    df = charges(
+        {"Case Number": "DISMISSED", "Disposition": "DISMISSED", "Disposition Date": "2020-01-01"},
+        {"Case Number": "FELONY", "Charge Class": "FELONY"},
+        {"Case Number": "OLD"},
+    )
+    strict = compile_rule_pack(pack(version="strict", waiting_periods=[
+        {"label": None, "match": {}, "days": 30 * 365},
+    ]))
+    results = evaluate_rule_packs(df, [get_plan(), strict], today=TODAY)
+    assert list(results) == [get_plan()["key"], "Test strict"]
+    assert_frame_equal(results[get_plan()["key"]], evaluate(df))
+    assert_frame_equal(results["Test strict"], evaluate(df, strict))
+    assert results["Test strict"].loc["OLD", "Eligibility"] == "⏳ Wait until 2031-05-25"
+    assert results[get_plan()["key"]].loc["DISMISSED", "Eligibility"] == "✅ Eligible - Non-Conviction"
+
+
+def test_charge_rules():
+    df = charges(
+        {"Statute Code": "27.342"},
+        {"Disposition": "DISMISSED"},
+        {},
+    )
+    _, charge_result = evaluate_rule_packs(df, [get_plan()], today=TODAY, with_charges=True)[
+        get_plan()["key"]]
+    assert charge_result["Charge Rule"].tolist()[:2] == ["Excluded Misdemeanor(s)", "Non-Conviction"]
+    # The unlabelled default waiting period names no rule
+    assert pd.isna(charge_result["Charge Rule"].iloc[2])
+    assert charge_result["Charge Eligibility Date"].tolist() == [
+        pd.Timestamp("2008-05-30"), pd.Timestamp("2004-05-31"), pd.Timestamp("2008-05-30")]
@@ -0,0 +1,119 @@
+import threading
+import pandas as pd
+import pytest
+from app.run_history import connect, diff_results, diff_runs, list_runs, load_run, record_run
+
+ELIGIBLE = "✅ Eligible"
+BLOCKED = "❌ Not Eligible - Felony"
+
+
+def result(**eligibility):
+    """A case-level result from Case Number=Eligibility pairs."""
+    return pd.DataFrame({"Case Number": list(eligibility),
+                         "Eligibility": list(eligibility.values())})
+
+
+def changes(before, after):
+    return diff_results(before, after).set_index("Case Number")["Change"].to_dict()
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = connect(tmp_path / "history.sqlite")
+    yield conn
+    conn.close()
+
+
+def test_change_types():
+    before = result(A="⏳ Wait until 2030-01-01", B=ELIGIBLE, C="⏳ Wait until 2030-01-01",
+                    D="⏳ Wait until 2030-01-01", E=BLOCKED, F=ELIGIBLE)
+    after = result(A=ELIGIBLE, B=BLOCKED, C="⏳ Wait until 2031-06-01",
+                   D="⏳ Wait until 2030-01-01 (Non-Conviction)", E=ELIGIBLE,
+                   F="✅ Eligible - Non-Conviction")
+    assert changes(before, after) == {
+        "A": "Newly Eligible",
+        "B": "Newly Blocked",
+        "C": "Wait Date Changed",
+        "E": "Newly Eligible",
+    }
+
+
+def test_blocked_for_another_reason_is_not_newly_blocked():
+    assert changes(result(A=BLOCKED), result(A="❌ Not Eligible - Domestic Violence Case")) == {}
+
+
+def test_new_cases_are_compared_with_no_status():
+    after = result(Z=ELIGIBLE, A=ELIGIBLE, B=BLOCKED, C="⏳ Wait until 2030-01-01")
+    assert changes(result(Z=ELIGIBLE), after) == {"A": "Newly Eligible", "B": "Newly Blocked"}
+
+
+def test_waiting_again_is_not_a_wait_date_change():
+    assert changes(result(A=ELIGIBLE), result(A="⏳ Wait until 2030-01-01")) == {}
+
+
+def test_diff_columns():
+    diff = diff_results(result(A="⏳ Wait until 2030-01-01"), result(A="⏳ Wait until 2031-01-01"))
+    assert diff.iloc[0].to_dict() == {
+        "Case Number": "A",
+        "Change": "Wait Date Changed",
+        "Eligibility Before": "⏳ Wait until 2030-01-01",
+        "Eligibility": "⏳ Wait until 2031-01-01",
+        "Wait Date Before": "2030-01-01",
+        "Wait Date": "2031-01-01",
+    }
+
+
+def test_runs_store_only_changes(conn):
+    first = record_run(conn, result(A=ELIGIBLE, B=BLOCKED, C=ELIGIBLE), "source")
+    second = record_run(conn, result(A=ELIGIBLE, B=ELIGIBLE, D=BLOCKED), "source")
+
+    runs = list_runs(conn).set_index("run_id")
+    assert runs.loc[first, "changed_count"] == 3
+    # B changed, C was removed and D is new
+    assert runs.loc[second, "changed_count"] == 3
+    assert load_run(conn, first).equals(result(A=ELIGIBLE, B=BLOCKED, C=ELIGIBLE))
+    assert load_run(conn, second).equals(result(A=ELIGIBLE, B=ELIGIBLE, D=BLOCKED))
+    assert changes(load_run(conn, first), load_run(conn, second)) == {
+        "B": "Newly Eligible", "D": "Newly Blocked"}
+    assert diff_runs(conn, first, second)["Case Number"].tolist() == ["B", "D"]
+
+
+def test_runs_are_chained_per_source(conn):
+    record_run(conn, result(A=ELIGIBLE), "first source")
+    other = record_run(conn, result(B=BLOCKED), "second source")
+    assert load_run(conn, other).equals(result(B=BLOCKED))
+
+
+def test_unknown_run(conn):
+    with pytest.raises(KeyError, match="Run 7 does not exist"):
+        load_run(conn, 7)
+
+
+def test_concurrent_runs_of_a_source_are_chained(tmp_path):
+    path = tmp_path / "history.sqlite"
+    conn = connect(path)
+    record_run(conn, result(A=ELIGIBLE, B=ELIGIBLE), "source")
+    conn.close()
+    inputs = {
+        "X": result(**{"A": ELIGIBLE, **{f"X{i}": ELIGIBLE for i in range(2000)}}),
+        "Y": result(**{"B": ELIGIBLE, **{f"Y{i}": ELIGIBLE for i in range(2000)}}),
+    }
+    run_ids = {}
+    barrier = threading.Barrier(len(inputs))
+
+    def run(name):
+        conn = connect(path)
+        barrier.wait()
+        run_ids[name] = record_run(conn, inputs[name], "source")
+        conn.close()
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in inputs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    conn = connect(path)
+    for name, run_id in run_ids.items():
+        assert set(load_run(conn, run_id)["Case Number"]) == set(inputs[name]["Case Number"])
+    conn.close()
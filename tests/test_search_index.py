@@ -0,0 +1,86 @@
+import pandas as pd
+import pytest
+from app.search_index import EXACT_SCORE, PREFIX_SCORE, SearchIndex, tokenize
+
+CASES = [
+    # Case Number, Name, Aliases, Case Title
+    ("1A", "JOHNSON, MARY", None, "State of Maryland vs Mary Johnson"),
+    ("2B", "JOHNS, PETER", "PETE JOHNS", "State of Maryland vs Peter Johns"),
+    ("3C", "JOHNSTON, MARY", None, "State of Maryland vs Mary Johnston"),
+    ("4D", "SMITH, JOHN", "JOHNNY SMITH; J SMITH", "State of Maryland vs John Smith"),
+    ("55E", "DOE, JANE", None, "Doe v. Acme"),
+]
+
+
+def build_index():
+    case_data = pd.DataFrame(
+        [(number, name, "✅ Eligible") for number, name, _, _ in CASES],
+        columns=["Case Number", "Name", "Eligibility"])
+    charges = pd.DataFrame(
+        [(number, aliases, title) for number, _, aliases, title in CASES],
+        columns=["Case Number", "Aliases", "Case Title"])
+    return SearchIndex(case_data, charges)
+
+
+@pytest.fixture(scope="module")
+def index():
+    return build_index()
+
+
+def found(index, query):
+    return index.search(query)["Case Number"].tolist()
+
+
+def test_tokenize_drops_stop_words_and_single_letters():
+    tokens = tokenize(pd.Series(["State of Maryland vs J. Smith-Jones 7"]))
+    assert tokens.tolist() == ["SMITH", "JONES", "7"]
+
+
+def test_exact_then_prefix_then_fuzzy(index):
+    results = index.search("johns")
+    assert results["Case Number"].tolist() == ["2B", "1A", "3C", "4D"]
+    assert results["Score"].iloc[:3].tolist() == [EXACT_SCORE, PREFIX_SCORE, PREFIX_SCORE]
+    # JOHN is a close misspelling, below any prefix match
+    assert 0 < results["Score"].iloc[3] < PREFIX_SCORE
+
+
+def test_prefix_ties_keep_row_order(index):
+    assert found(index, "mar") == ["1A", "3C"]
+
+
+def test_fuzzy_match_ranks_below_prefix(index):
+    results = index.search("jonson")
+    assert results["Case Number"].iloc[0] == "1A"
+    assert 0 < results["Score"].iloc[0] < PREFIX_SCORE
+
+
+def test_more_matched_words_rank_first(index):
+    # 2B is the only exact JOHNS, but 1A and 3C also match "mary"
+    assert found(index, "mary johns") == ["1A", "3C", "2B", "4D"]
+
+
+def test_aliases_and_titles_are_searched(index):
+    assert found(index, "johnny")[0] == "4D"
+    assert found(index, "acme") == ["55E"]
+
+
+def test_case_numbers_are_prefix_matched(index):
+    assert found(index, "55") == ["55E"]
+    assert found(index, "4d") == ["4D"]
+
+
+def test_stop_words_only_matches_nothing(index):
+    assert index.search("state of maryland").empty
+
+
+def test_limit(index):
+    assert len(index.search("joh", limit=2)) == 2
+    # Single letters are not indexed
+    assert index.search("j").empty
+
+
+def test_update_eligibility():
+    index = build_index()
+    index.update_eligibility(pd.Series({"3C": "⏳ Wait until 2030-01-01"}))
+    assert index.search("johnston")["Eligibility"].iloc[0] == "⏳ Wait until 2030-01-01"
+    assert index.search("johnson")["Eligibility"].iloc[0] == "✅ Eligible"
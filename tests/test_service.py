@@ -0,0 +1,97 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+import pytest
+from app.service import EligibilityService, create_server
+from utils.data_loader import load_example_data
+
+CHARGE = {
+    "Case Number": "ADHOC-1",
+    "Case Type": "Criminal",
+    "Statute Code": "27.111",
+    "Charge Description": "SAMPLE CHARGE",
+    "Charge Class": "Misdemeanor",
+    "Disposition": "DISMISSED",
+    "Disposition Date": "2001-06-01",
+}
+
+
+@pytest.fixture(scope="module")
+def service():
+    return EligibilityService(*load_example_data().values())
+
+
+@pytest.fixture(scope="module")
+def base_url(service):
+    server = create_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def request(base_url, path, body=None):
+    """Returns (status, JSON body) for a GET, or a POST when body is given."""
+    data = json.dumps(body).encode() if body is not None else None
+    try:
+        with urllib.request.urlopen(urllib.request.Request(base_url + path, data=data)) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_case_lookup(service, base_url):
+    case_number = service.case_data["Case Number"].iloc[0]
+    status, case = request(base_url, f"/cases/{case_number}")
+    assert status == 200
+    assert case["Case Number"] == case_number
+    assert case["Eligibility"] == service.case_data.loc[case_number, "Eligibility"]
+    assert len(case["Charges"]) == len(service.charge_rows[case_number])
+
+
+def test_case_lookup_ignores_query_string(service, base_url):
+    case_number = service.case_data["Case Number"].iloc[0]
+    status, case = request(base_url, f"/cases/{case_number}?x=1")
+    assert status == 200
+    assert case["Case Number"] == case_number
+
+
+def test_unknown_case_is_404(base_url):
+    assert request(base_url, "/cases/NO-SUCH-CASE")[0] == 404
+
+
+def test_party_lookup(service, base_url):
+    party_id, person_id = next(iter(service.party_person.items()))
+    status, party = request(base_url, f"/parties/{party_id}")
+    assert status == 200
+    assert party["PersonID"] == person_id
+    assert {case["Case Number"] for case in party["Cases"]} == set(
+        service.person_cases[person_id])
+
+
+def test_evaluate(base_url):
+    status, body = request(base_url, "/evaluate", {"charges": [CHARGE]})
+    assert status == 200
+    assert body["cases"][0]["Case Number"] == "ADHOC-1"
+    assert body["cases"][0]["Eligibility"].startswith("✅ Eligible")
+
+
+def test_evaluate_rejects_bad_dates(base_url):
+    status, body = request(
+        base_url, "/evaluate", {"charges": [dict(CHARGE, **{"Disposition Date": "06/01/2001"})]})
+    assert status == 400
+    assert "Disposition Date" in body["error"]
+
+
+def test_evaluate_rejects_missing_fields(base_url):
+    status, _ = request(base_url, "/evaluate", {"charges": [{"Case Number": "ADHOC-2"}]})
+    assert status == 400
+
+
+def test_metrics(base_url):
+    request(base_url, "/health")
+    status, metrics = request(base_url, "/metrics")
+    assert status == 200
+    assert metrics["routes"]["health"]["requests"] >= 1
+    assert {"uptime_s", "batches", "mean_batch_size"} <= metrics.keys()
@@ -1,8 +1,56 @@
+DATE_FORMAT = "%m/%d/%Y"
+
+# Declarative schema for each input table: target dtype ("int", "str" or
+# "date"), value normalization applied to strings, and the expected date format.
+# Optional columns are coerced when present but not required.
+# Column order matches the expected CSV layout.
+COLUMN_SPECS = {
+    "parties": {
+        "PartyID": {"dtype": "int"},
+        "Name": {"dtype": "str", "normalize": ["strip"]},
+        "Race": {"dtype": "str", "normalize": ["strip"]},
+        "Sex": {"dtype": "str", "normalize": ["strip"]},
+        "DOB": {"dtype": "date", "format": DATE_FORMAT},
+        "Address": {"dtype": "str", "normalize": ["strip"]},
+        "City": {"dtype": "str", "normalize": ["strip"]},
+        "State": {"dtype": "str", "normalize": ["strip", "upper"]},
+        "Zip Code": {"dtype": "str", "normalize": ["strip"]},
+        "Aliases": {"dtype": "str", "normalize": ["strip"]},
+    },
+    "cases": {
+        "CaseID": {"dtype": "int"},
+        "PartyID": {"dtype": "int"},
+        "Case Title": {"dtype": "str", "normalize": ["strip"]},
+        "Case Number": {"dtype": "str", "normalize": ["strip"]},
+        "Court System": {"dtype": "str", "normalize": ["strip"]},
+        "Location": {"dtype": "str", "normalize": ["strip"]},
+        "Case Type": {"dtype": "str", "normalize": ["strip", "upper"]},
+        "Filing Date": {"dtype": "date", "format": DATE_FORMAT},
+        "Case Status": {"dtype": "str", "normalize": ["strip"]},
+        "Judicial Officer": {"dtype": "str", "normalize": ["strip"]},
+    },
+    "charges": {
+        "ChargeID": {"dtype": "int"},
+        "CaseID": {"dtype": "int"},
+        "Charge No": {"dtype": "int"},
+        "CJIS Code": {"dtype": "str", "normalize": ["strip"]},
+        "Statute Code": {"dtype": "str", "normalize": ["strip", "upper"]},
+        "Charge Description": {"dtype": "str", "normalize": ["strip"]},
+        "Charge Class": {"dtype": "str", "normalize": ["strip", "upper"]},
+        "Offense Date": {"dtype": "date", "format": DATE_FORMAT},
+        "Agency Name": {"dtype": "str", "normalize": ["strip"]},
+        "Plea": {"dtype": "str", "normalize": ["strip"]},
+        "Plea Date": {"dtype": "date", "format": DATE_FORMAT},
+        "Disposition": {"dtype": "str", "normalize": ["strip"]},
+        "Disposition Date": {"dtype": "date", "format": DATE_FORMAT},
+        "Jail Term (Years)": {"dtype": "int", "optional": True},
+        "Probation (Years)": {"dtype": "int", "optional": True},
+    },
+}
 
 REQUIRED_COLUMNS = {
-    "parties": ["PartyID", "Name", "Race", "Sex", "DOB", "Address", "City", "State", "Zip Code", "Aliases"],
-    "cases": ["CaseID", "PartyID", "Case Title", "Case Number", "Court System", "Location", "Case Type", "Filing Date", "Case Status", "Judicial Officer"],
-    "charges": ["ChargeID", "CaseID", "Charge No", "CJIS Code", "Statute Code", "Charge Description", "Charge Class", "Offense Date", "Agency Name", "Plea", "Plea Date", "Disposition", "Disposition Date"],
+    table: [col for col, rules in columns.items() if not rules.get("optional")]
+    for table, columns in COLUMN_SPECS.items()
 }
 
 EXCLUDED_MISDEMEANORS = {
@@ -18,3 +66,49 @@ WAIT_PERIODS = {
     "misdemeanor": 7 * 365,  # 7 years
     "non_conviction": 3 * 365  # 3 years
 }
+
+# Rule packs describe a jurisdiction's eligibility rules as data. They are
+# compiled by utils.rules into a vectorized evaluation plan. Exclusions are
+# checked in order and the first match decides the case; blockers disqualify
+# every case of the same person; the first matching waiting period applies to
+# each charge, and the charge with the latest eligibility date decides the case
+# (ties broken by "row_order" or "class_order").
+MARYLAND_RULE_PACK = {
+    "name": "Maryland",
+    "version": "2025.1",
+    "exclusions": [
+        {
+            "reason": "Excluded Misdemeanor(s)",
+            "match": {"Statute Code": {"in": list(EXCLUDED_MISDEMEANORS)}},
+            "detail": "{Charge Description} ({Statute Code})",
+        },
+        {
+            "reason": "Domestic Violence Case",
+            "match": {"Case Type": {"contains": "DOMESTIC VIOLENCE"}},
+        },
+        {
+            "reason": "Felony",
+            "match": {"Charge Class": {"contains": "FELONY"}},
+        },
+    ],
+    "blockers": [],
+    "waiting_periods": [
+        {
+            "label": "Non-Conviction",
+            "match": {"Disposition": {"contains_any": NON_CONVICTION_TERMS}},
+            "days": WAIT_PERIODS["non_conviction"],
+        },
+        {
+            "label": None,
+            "match": {},
+            "days": WAIT_PERIODS["misdemeanor"],
+        },
+    ],
+    "tie_break": "row_order",
+}
+
+RULE_PACKS = {
+    "Maryland 2025.1": MARYLAND_RULE_PACK,
+}
+
+DEFAULT_RULE_PACK = "Maryland 2025.1"
@@ -0,0 +1,65 @@
+import pandas as pd
+
+CUBE_DIMENSIONS = ["Court System", "Location", "Case Type", "Agency Name", "Eligible Month"]
+STATUSES = {"✅": "✅ Eligible", "⏳": "⏳ Waiting", "❌": "❌ Not Eligible"}
+UNKNOWN = "Unknown"
+NO_MONTH = "N/A"
+
+
+def case_cells(charges):
+    """
+    Places each case in one cube cell: its dimensions plus Status. Agency Name
+    is taken from the case's first charge so every case is counted once.
+    Eligible Month is the month of the case's Eligibility Date (N/A for cases
+    that are not eligible).
+    """
+    cases = charges.drop_duplicates("Case Number").set_index("Case Number")
+    cells = pd.DataFrame(index=cases.index)
+    for dim in CUBE_DIMENSIONS[:-1]:
+        values = cases[dim] if dim in cases else pd.Series(pd.NA, index=cases.index)
+        cells[dim] = values.astype("string").fillna(UNKNOWN)
+    eligibility_date = pd.to_datetime(
+        cases.get("Eligibility Date", pd.Series(pd.NaT, index=cases.index)))
+    cells["Eligible Month"] = eligibility_date.dt.strftime("%Y-%m").fillna(NO_MONTH)
+    cells["Status"] = cases["Eligibility"].str[:1].map(STATUSES).fillna(UNKNOWN)
+    return cells
+
+
+def build_cube(charges):
+    """Case counts per (dimensions, Status) cell, built from the charge-level result in one grouped pass."""
+    return _count(case_cells(charges))
+
+
+def _count(cells):
+    return cells.groupby(CUBE_DIMENSIONS + ["Status"]).size().rename("Cases").reset_index()
+
+
+def update_cube(cube, old_charges, new_charges):
+    """
+    Applies re-evaluated cases to a cube without rebuilding it: the cases'
+    previous cells (from old_charges) are subtracted and their new cells added.
+    """
+    keys = CUBE_DIMENSIONS + ["Status"]
+    delta = pd.concat([
+        _count(case_cells(new_charges)),
+        _count(case_cells(old_charges)).assign(Cases=lambda df: -df["Cases"]),
+    ])
+    updated = (
+        pd.concat([cube, delta])
+        .groupby(keys)["Cases"].sum()
+        .reset_index()
+    )
+    return updated[updated["Cases"] != 0].reset_index(drop=True)
+
+
+def slice_cube(cube, filters, by):
+    """
+    Cases per value of one dimension (rows) and Status (columns), counting
+    only cells matching filters ({dimension: [values]}; empty lists match all).
+    """
+    mask = pd.Series(True, index=cube.index)
+    for dim, values in filters.items():
+        if values:
+            mask &= cube[dim].isin(values)
+    return cube[mask].pivot_table(
+        index=by, columns="Status", values="Cases", aggfunc="sum", fill_value=0)
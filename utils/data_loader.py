@@ -1,15 +1,40 @@
+from functools import lru_cache
+from pathlib import Path
 import pandas as pd
+from utils.schema import apply_schema
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+@lru_cache(maxsize=1)
+def _read_example_data():
+    """Reads and coerces the example CSVs once per process. Raises if they cannot be read, so failures are not cached."""
+    tables = {
+        name: pd.read_csv(DATA_DIR / f"{name}.csv")
+        for name in ["parties", "cases", "charges"]
+    }
+    for name, df in tables.items():
+        apply_schema(df, name)
+    return tables
 
 
 def load_example_data():
+    """
+    Returns the example tables, read and coerced on first use. Each call gets
+    its own copies of the cached DataFrames, since the pipeline modifies its
+    inputs in place. Returns an empty dict if the example data cannot be read.
+    """
     try:
-        return {
-            name: pd.read_csv(f"data/{name}.csv")
-            for name in ["parties", "cases", "charges"]
-        }
+        tables = _read_example_data()
     except Exception as e:
         print(f"Error loading example data: {e}")
         return {}
+    return {name: df.copy() for name, df in tables.items()}
 
 
-EXAMPLE_DATA = load_example_data()
+def load_tables(data_dir=None):
+    """Reads parties/cases/charges CSVs from data_dir, or the example data."""
+    if data_dir is None:
+        return tuple(load_example_data().values())
+    return tuple(pd.read_csv(Path(data_dir) / f"{name}.csv")
+                 for name in ["parties", "cases", "charges"])
@@ -0,0 +1,34 @@
+from utils.constants import EXCLUDED_MISDEMEANORS, NON_CONVICTION_TERMS
+
+
+def categorize_charges(df):
+    """
+    Categorizes charges based on class, disposition, statute code, and case type.
+    - Identifies misdemeanors and felonies.
+    - Flags non-convictions based on predefined terms.
+    - Marks excluded misdemeanors based on statute codes.
+    - Identifies domestic violence cases.
+    """
+    conditions = {
+        "Charge Class": {
+            "Is Misdemeanor": lambda x: x.str.contains("MISDEMEANOR", case=False, na=False),
+            "Is Felony": lambda x: x.str.contains("FELONY", case=False, na=False),
+        },
+        "Disposition": {
+            "Is Non-Conviction": lambda x: x.str.upper().str.contains('|'.join(NON_CONVICTION_TERMS), na=False),
+        },
+        "Statute Code": {
+            "Is Excluded Misdemeanor": lambda x: x.isin(EXCLUDED_MISDEMEANORS.keys()),
+        },
+        "Case Type": {
+            "Is Domestic Violence": lambda x: x.str.contains("DOMESTIC VIOLENCE", case=False, na=False),
+        }
+    }
+
+    for col, mappings in conditions.items():
+        if col in df.columns:
+            for new_col, func in mappings.items():
+                df[new_col] = func(df[col])
+
+    return df
+
@@ -0,0 +1,96 @@
+import re
+import numpy as np
+import pandas as pd
+
+NAME_SUFFIXES = {"JR", "SR", "II", "III", "IV"}
+ALIAS_SEPARATOR = r"[;|]"
+# Blocks larger than this are almost always placeholder data (e.g. a shared
+# default DOB) and are left unresolved rather than compared pairwise.
+MAX_BLOCK_SIZE = 50
+
+
+def normalize_name(name):
+    """
+    Builds an order-insensitive name key: uppercase tokens without punctuation,
+    suffixes or middle initials, sorted so "SMITH, JAMES A Jr." and
+    "James Smith" produce the same key.
+    """
+    if not isinstance(name, str):
+        return None
+    tokens = re.sub(r"[^A-Z ]", " ", name.upper()).split()
+    tokens = [t for t in tokens if len(t) > 1 and t not in NAME_SUFFIXES]
+    return " ".join(sorted(tokens)) or None
+
+
+def _name_keys(parties_df):
+    """Returns one row per (PartyID, name key) from the name and each alias."""
+    names = parties_df[["PartyID", "Name"]]
+    aliases = (
+        parties_df[["PartyID", "Aliases"]]
+        .assign(Aliases=parties_df["Aliases"].str.split(ALIAS_SEPARATOR))
+        .explode("Aliases")
+        .rename(columns={"Aliases": "Name"})
+    )
+    keys = pd.concat([names, aliases], ignore_index=True)
+    keys["Name Key"] = keys["Name"].map(normalize_name)
+    return keys.drop(columns="Name")
+
+
+def _connected_components(party_ids, left, right):
+    """Labels each party with the smallest PartyID reachable through the edges."""
+    position = pd.Index(party_ids)
+    labels = np.asarray(party_ids).copy()
+    a = position.get_indexer(left)
+    b = position.get_indexer(right)
+
+    while True:
+        edge_min = np.minimum(labels[a], labels[b])
+        updated = labels.copy()
+        np.minimum.at(updated, a, edge_min)
+        np.minimum.at(updated, b, edge_min)
+        # Pointer jumping collapses long chains in a few passes
+        updated = updated[position.get_indexer(updated)]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def resolve_parties(parties_df):
+    """
+    Adds a stable PersonID column linking parties that are the same person.
+    Parties are blocked on DOB plus a normalized key from the name and each
+    alias; pairs within a block are then compared on sex. Linked parties share
+    the smallest PartyID among them, so IDs stay stable as new parties arrive.
+    """
+    parties_df["PersonID"] = parties_df["PartyID"]
+    candidates = parties_df.dropna(subset=["PartyID", "DOB"])
+    if candidates.empty:
+        return parties_df
+
+    keys = _name_keys(candidates).merge(
+        candidates[["PartyID", "DOB", "Sex"]], on="PartyID")
+    keys = keys.dropna(subset=["Name Key"]).drop_duplicates(
+        ["PartyID", "DOB", "Name Key"])
+
+    block_size = keys.groupby(["DOB", "Name Key"])["PartyID"].transform("size")
+    keys = keys[(block_size > 1) & (block_size <= MAX_BLOCK_SIZE)]
+
+    pairs = keys.merge(keys, on=["DOB", "Name Key"], suffixes=("", " Other"))
+    pairs = pairs[pairs["PartyID"] < pairs["PartyID Other"]]
+    sex_conflict = (
+        pairs["Sex"].notna() & pairs["Sex Other"].notna()
+        & (pairs["Sex"].str.upper() != pairs["Sex Other"].str.upper())
+    )
+    pairs = pairs[~sex_conflict.astype(bool)]
+    if pairs.empty:
+        return parties_df
+
+    party_ids = parties_df["PartyID"].dropna().unique().astype("int64")
+    labels = _connected_components(
+        party_ids,
+        pairs["PartyID"].to_numpy("int64"),
+        pairs["PartyID Other"].to_numpy("int64"),
+    )
+    parties_df["PersonID"] = parties_df["PartyID"].map(
+        pd.Series(labels, index=party_ids)).astype(parties_df["PartyID"].dtype)
+    return parties_df
@@ -0,0 +1,289 @@
+import json
+import re
+import string
+from datetime import datetime
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from utils.constants import RULE_PACKS, DEFAULT_RULE_PACK
+
+RULE_PACK_KEYS = ["name", "version", "exclusions", "waiting_periods"]
+# Keys every rule in each section must have
+RULE_KEYS = {
+    "exclusions": ["reason", "match"],
+    "blockers": ["reason", "match"],
+    "waiting_periods": ["match", "days"],
+}
+TIE_BREAKS = ["row_order", "class_order"]
+PERSON_KEYS = ["PersonID", "PartyID"]
+
+NO_DISPOSITION_DATE = "❌ Not Eligible - No valid disposition date"
+NO_WAITING_PERIOD = "❌ Not Eligible - No applicable waiting period"
+
+# Match operators. Each takes the rule value and returns a test applied to a
+# whole column at once; string comparisons are case-insensitive except "in",
+# which compares against values already normalized by the column spec.
+OPERATORS = {
+    "in": lambda values: lambda s: s.isin(set(values)),
+    "equals": lambda value: lambda s: s.str.upper() == str(value).upper(),
+    "contains": lambda value: lambda s: s.str.contains(
+        re.escape(value), case=False, na=False),
+    "contains_any": lambda values: lambda s: s.str.contains(
+        "|".join(map(re.escape, values)), case=False, na=False),
+}
+
+
+def load_rule_pack(path):
+    """Loads a rule pack from a JSON file and checks its required sections."""
+    with open(path, encoding="utf-8") as f:
+        pack = json.load(f)
+
+    missing = [key for key in RULE_PACK_KEYS if key not in pack]
+    if missing:
+        raise ValueError(
+            f"Rule pack {path} is missing required keys: {', '.join(missing)}")
+    validate_rules(pack, path)
+    return pack
+
+
+def validate_rules(pack, name):
+    """Checks each rule's required keys and match shape, so a malformed rule fails with a clear ValueError."""
+    for section, keys in RULE_KEYS.items():
+        rules = pack.get(section, [])
+        if not isinstance(rules, list):
+            raise ValueError(f"Rule pack {name}: {section} must be a list of rules")
+        for i, rule in enumerate(rules):
+            if not isinstance(rule, dict):
+                raise ValueError(f"Rule pack {name}: {section}[{i}] must be an object")
+            missing = [key for key in keys if key not in rule]
+            if missing:
+                raise ValueError(
+                    f"Rule pack {name}: {section}[{i}] is missing {', '.join(missing)}")
+            match = rule["match"]
+            if not isinstance(match, dict) or not all(
+                    isinstance(conditions, dict) for conditions in match.values()):
+                raise ValueError(
+                    f"Rule pack {name}: {section}[{i}] match must map columns to "
+                    "{operator: value}")
+            if section == "waiting_periods" and not isinstance(rule["days"], (int, float)):
+                raise ValueError(f"Rule pack {name}: {section}[{i}] days must be a number")
+
+
+def _compile_match(match):
+    """Compiles {column: {operator: value}} into a row mask function (all must hold)."""
+    tests = []
+    for column, conditions in match.items():
+        for operator, value in conditions.items():
+            if operator not in OPERATORS:
+                raise ValueError(f"Unknown rule operator: {operator}")
+            tests.append((column, OPERATORS[operator](value)))
+
+    def predicate(df):
+        mask = np.ones(len(df), dtype=bool)
+        for column, test in tests:
+            values = df[column]
+            if not pd.api.types.is_numeric_dtype(values):
+                values = values.astype("string")
+            mask &= test(values).to_numpy(dtype=bool, na_value=False)
+        return mask
+
+    return predicate
+
+
+def _compile_detail(template):
+    """Compiles a "{Column} text" template into a function formatting whole columns."""
+    parts = list(string.Formatter().parse(template))
+
+    def detail(df):
+        text = pd.Series("", index=df.index, dtype="string")
+        for literal, column, _, _ in parts:
+            text = text + literal
+            if column is not None:
+                text = text + df[column].astype("string").fillna("")
+        return text
+
+    return detail
+
+
+def compile_rule_pack(pack):
+    """Compiles a rule pack dict into an evaluation plan of column-wise predicates."""
+    tie_break = pack.get("tie_break", "row_order")
+    if tie_break not in TIE_BREAKS:
+        raise ValueError(f"Unknown tie_break: {tie_break}")
+
+    return {
+        "key": f"{pack['name']} {pack['version']}",
+        "exclusions": [
+            {
+                "reason": rule["reason"],
+                "predicate": _compile_match(rule["match"]),
+                "detail": _compile_detail(rule["detail"]) if rule.get("detail") else None,
+            }
+            for rule in pack["exclusions"]
+        ],
+        "blockers": [
+            {"reason": rule["reason"], "predicate": _compile_match(rule["match"])}
+            for rule in pack.get("blockers", [])
+        ],
+        "waiting_periods": [
+            {
+                "label": rule.get("label"),
+                "predicate": _compile_match(rule["match"]),
+                "days": rule["days"],
+            }
+            for rule in pack["waiting_periods"]
+        ],
+        "tie_break": tie_break,
+    }
+
+
+@lru_cache(maxsize=None)
+def get_plan(name=DEFAULT_RULE_PACK):
+    """Returns the compiled plan for a registered rule pack, compiling it once."""
+    return compile_rule_pack(RULE_PACKS[name])
+
+
+def _cases_with(mask, codes, n_cases):
+    """Marks every case that has at least one row in the mask."""
+    return np.bincount(codes[mask], minlength=n_cases) > 0
+
+
+def _join_by_case(texts, codes):
+    """Joins row texts with "; " per case, keeping row order; returns (codes, texts)."""
+    order = np.argsort(codes, kind="stable")
+    codes, texts = codes[order], texts.to_numpy(dtype=object)[order].tolist()
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(codes)]
+    joined = np.array(
+        ["; ".join(texts[a:b]) for a, b in zip(starts, ends)], dtype=object)
+    return codes[starts], joined
+
+
+def _evaluate_plan(df, plan, codes, n_cases, disposition, latest, today):
+    """Returns (case-level result, per-charge "Charge Eligibility Date" and "Charge Rule")."""
+    status = np.full(n_cases, None, dtype=object)
+    status[np.isnat(latest)] = NO_DISPOSITION_DATE
+    # The rule that applies to each charge: its first exclusion or blocker,
+    # otherwise the label of its waiting period
+    charge_rule = np.full(len(codes), None, dtype=object)
+    ruled = np.zeros(len(codes), dtype=bool)
+
+    for rule in plan["exclusions"]:
+        mask = rule["predicate"](df)
+        charge_rule[mask & ~ruled] = rule["reason"]
+        ruled |= mask
+        hit = _cases_with(mask, codes, n_cases) & pd.isnull(status)
+        message = f"❌ Not Eligible - {rule['reason']}"
+        if rule["detail"] is None or not hit.any():
+            status[hit] = message
+        else:
+            detail_codes, details = _join_by_case(rule["detail"](df[mask]), codes[mask])
+            keep = hit[detail_codes]
+            status[detail_codes[keep]] = [f"{message}: {text}" for text in details[keep]]
+
+    if plan["blockers"]:
+        person_key = next((key for key in PERSON_KEYS if key in df.columns), None)
+        if person_key is None:
+            raise ValueError(
+                f"Rule pack {plan['key']} has blockers, which need a "
+                f"{' or '.join(PERSON_KEYS)} column to find each person's other cases")
+        for rule in plan["blockers"]:
+            blocked = df.loc[rule["predicate"](df), person_key].dropna().unique()
+            mask = df[person_key].isin(blocked).to_numpy(dtype=bool, na_value=False)
+            charge_rule[mask & ~ruled] = rule["reason"]
+            ruled |= mask
+            hit = _cases_with(mask, codes, n_cases) & pd.isnull(status)
+            status[hit] = f"❌ Not Eligible - {rule['reason']}"
+
+    # Waiting periods: the first matching rule gives each charge its wait
+    periods = plan["waiting_periods"]
+    period_index = np.select(
+        [rule["predicate"](df) for rule in periods], np.arange(len(periods)), default=-1)
+    days = np.array([rule["days"] for rule in periods] + [np.nan])[period_index]
+    eligibility_dates = disposition + pd.to_timedelta(days, unit="D").to_numpy()
+
+    # The charge with the latest eligibility date decides each case
+    date_key = eligibility_dates.view("int64")
+    date_key = np.where(np.isnat(eligibility_dates), np.iinfo(np.int64).max, -date_key)
+    class_key = period_index if plan["tie_break"] == "class_order" else np.zeros_like(codes)
+    order = np.lexsort((np.arange(len(codes)), class_key, date_key, codes))
+    sorted_codes = codes[order]
+    first = order[np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]]
+
+    case_codes = codes[first]
+    deciding_date = np.full(n_cases, np.datetime64("NaT"), dtype=eligibility_dates.dtype)
+    deciding_date[case_codes] = eligibility_dates[first]
+    deciding_period = np.full(n_cases, -1)
+    deciding_period[case_codes] = period_index[first]
+    relevant = latest.copy()
+    pending = pd.isnull(status)
+    relevant[case_codes[pending[case_codes]]] = disposition[first[pending[case_codes]]]
+
+    labels = [rule["label"] for rule in periods] + [None]
+    charge_rule[~ruled] = np.array(labels, dtype=object)[period_index[~ruled]]
+    eligible_text = np.array(
+        [f"✅ Eligible - {label}" if label else "✅ Eligible" for label in labels], dtype=object)
+    wait_suffix = np.array(
+        [f" ({label})" if label else "" for label in labels], dtype=object)
+
+    no_period = pending & np.isnat(deciding_date)
+    status[no_period] = NO_WAITING_PERIOD
+    pending &= ~no_period
+    eligible = pending & (deciding_date <= today)
+    waiting = pending & ~eligible
+    status[eligible] = eligible_text[deciding_period[eligible]]
+    wait_dates = pd.DatetimeIndex(deciding_date[waiting]).strftime("%Y-%m-%d")
+    status[waiting] = (
+        "⏳ Wait until " + np.asarray(wait_dates, dtype=object)
+        + wait_suffix[deciding_period[waiting]]
+    )
+
+    cases = pd.DataFrame({
+        "Eligibility": status,
+        "Eligibility Date": np.where(pending, deciding_date, np.datetime64("NaT")),
+        "Most Relevant Disposition Date": relevant,
+    })
+    charges = {"Charge Eligibility Date": eligibility_dates, "Charge Rule": charge_rule}
+    return cases, charges
+
+
+def evaluate_rule_packs(df, plans, today=None, with_charges=False):
+    """
+    Evaluates one or more compiled plans against the same charge-level frame.
+    Case grouping and disposition dates are computed once and shared, so
+    comparing rule-pack versions costs only the per-plan predicates. Returns
+    {plan key: case-level DataFrame indexed by Case Number}. With
+    with_charges, each value is (case-level DataFrame, charge-level DataFrame
+    aligned with df) where the charge level holds each charge's own
+    "Charge Eligibility Date" and the "Charge Rule" that applies to it.
+    """
+    today = np.datetime64(pd.Timestamp(today or datetime.today()))
+    codes, case_numbers = pd.factorize(df["Case Number"])
+    rows = codes >= 0
+    if not rows.any():
+        raise ValueError("No charges with a Case Number to evaluate")
+    index = df.index
+    df, codes = df[rows], codes[rows]
+    n_cases = len(case_numbers)
+
+    disposition = pd.to_datetime(df["Disposition Date"]).to_numpy()
+    latest = (
+        pd.Series(disposition).groupby(codes).max()
+        .reindex(range(n_cases)).to_numpy()
+    )
+
+    results = {}
+    for plan in plans:
+        result, charge_values = _evaluate_plan(
+            df, plan, codes, n_cases, disposition, latest, today)
+        result.index = pd.Index(case_numbers, name="Case Number")
+        if not with_charges:
+            results[plan["key"]] = result
+            continue
+        charges = pd.DataFrame(index=index)
+        for column, values in charge_values.items():
+            full = np.full(len(index), None, dtype=object if values.dtype == object else values.dtype)
+            full[rows] = values
+            charges[column] = full
+        results[plan["key"]] = (result, charges)
+    return results
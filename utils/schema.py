@@ -0,0 +1,99 @@
+from datetime import date
+import pandas as pd
+from utils.constants import COLUMN_SPECS, REQUIRED_COLUMNS
+
+MAX_BAD_EXAMPLES = 5
+
+
+def _coerce_int(series):
+    numbers = pd.to_numeric(series, errors="coerce")
+    # Non-integral values (e.g. "1.5") are unreadable, like non-numeric ones
+    return numbers.where(numbers.mod(1).eq(0)).astype("Int64")
+
+
+def _coerce_str(series, normalize=()):
+    series = series.astype("string")
+    if "strip" in normalize:
+        series = series.str.strip()
+    if "upper" in normalize:
+        series = series.str.upper()
+    return series
+
+
+def _coerce_date(series, date_format=None):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    # Database drivers hand back date objects, which need no parsing
+    if series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) in ("date", "datetime"):
+        return pd.to_datetime(series)
+    parsed = pd.to_datetime(
+        series.astype("string").str.strip(), format=date_format, errors="coerce")
+    # Date objects mixed with text only show up among the values that failed to parse
+    is_date = (parsed.isna() & series.notna()).to_numpy(copy=True)
+    if series.dtype == object and is_date.any():
+        is_date[is_date] = [isinstance(value, date) for value in series[is_date]]
+        parsed[is_date] = pd.to_datetime(series[is_date]).to_numpy()
+    return parsed
+
+
+def coerce_columns(df, spec):
+    """
+    Coerces the columns named in spec ({column: rules}) in place and returns
+    bad_values for those columns, as described in apply_schema. Optional
+    columns that df does not have are skipped.
+    """
+    bad_values = {}
+    for col, rules in spec.items():
+        if rules.get("optional") and col not in df.columns:
+            continue
+        raw = df[col]
+        dtype = rules["dtype"]
+
+        if dtype == "int":
+            coerced = _coerce_int(raw)
+        elif dtype == "date":
+            coerced = _coerce_date(raw, rules.get("format"))
+        else:
+            coerced = _coerce_str(raw, rules.get("normalize", ()))
+
+        bad = raw[coerced.isna() & raw.notna()]
+        df[col] = coerced
+        if not bad.empty:
+            bad_values[col] = {
+                "count": len(bad),
+                "examples": bad.astype(str).unique()[:MAX_BAD_EXAMPLES].tolist(),
+            }
+    return bad_values
+
+
+def apply_schema(df, table):
+    """
+    Validates and coerces a raw table in place against COLUMN_SPECS[table].
+    Each column is converted once, vectorized, to its target dtype and
+    normalized form. Returns a tuple of (missing_columns, bad_values) where
+    bad_values maps a column to the count and a sample of values that could
+    not be coerced.
+    """
+    spec = COLUMN_SPECS[table]
+    df.columns = df.columns.str.strip()
+
+    missing = [col for col in REQUIRED_COLUMNS[table] if col not in df.columns]
+    if missing:
+        return missing, {}
+
+    if df.attrs.get("schema") == table:
+        return [], {}
+
+    bad_values = coerce_columns(df, spec)
+    df.attrs["schema"] = table
+    return [], bad_values
+
+
+def schema_messages(name, missing, bad_values):
+    """Formats the result of apply_schema as (level, message) pairs for display."""
+    if missing:
+        return [("error", f"❌ {name} data is missing required columns: {', '.join(missing)}")]
+    return [
+        ("warning", f"⚠️ {name} column `{col}` has {bad['count']} value(s) that could not be read: {', '.join(bad['examples'])}")
+        for col, bad in bad_values.items()
+    ]